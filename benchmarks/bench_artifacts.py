@@ -0,0 +1,144 @@
+"""
+Size, load time and per-worker memory of the pipeline artifact formats.
+
+The trained pipeline (or a freshly fitted one, if none is saved) is written
+once per format: uncompressed, uncompressed loaded with mmap_mode="r", and
+zlib/lzma compressed. Each load runs in a fresh interpreter, which reports
+the load time and how much of the added RSS is private to the worker versus
+shared file-backed pages. --compiled stores the forest as a CompiledForest,
+whose flat node arrays can stay memory-mapped after loading.
+
+    python benchmarks/bench_artifacts.py [--compiled]
+"""
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import argparse
+import json
+import subprocess
+import tempfile
+import time
+import typing as t
+
+# (name, compression, mmap_mode)
+FORMATS = (
+    ("uncompressed", None, None),
+    ("uncompressed_mmap", None, "r"),
+    ("zlib_3", ("zlib", 3), None),
+    ("lzma_3", ("lzma", 3), None),
+)
+
+
+def _memory_mb() -> t.Dict[str, float]:
+    """Rss and its private part from /proc/self/smaps_rollup (Linux only)."""
+    fields = {"Rss": 0.0, "Private_Clean": 0.0, "Private_Dirty": 0.0}
+    try:
+        with open("/proc/self/smaps_rollup") as rollup:
+            for line in rollup:
+                name = line.split(":")[0]
+                if name in fields:
+                    fields[name] = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return {"rss": fields["Rss"], "private": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+
+def load_artifact(*, path: str, mmap_mode: t.Optional[str]) -> dict:
+    """Load one artifact and report time and memory added by the load."""
+    from bikeshare_model.processing.data_manager import load_pipeline
+
+    before = _memory_mb()
+    start = time.perf_counter()
+    pipeline = load_pipeline(file_name=path, mmap_mode=mmap_mode)
+    seconds = time.perf_counter() - start
+    after = _memory_mb()
+    del pipeline
+
+    return {
+        "load_seconds": seconds,
+        "rss_mb": after["rss"] - before["rss"],
+        "private_mb": after["private"] - before["private"],
+    }
+
+
+def _source_pipeline(*, compiled: bool):
+    from bikeshare_model.config.core import TRAINED_MODEL_DIR, config
+    from bikeshare_model.pipeline import build_bikeshare_pipe
+    from bikeshare_model.processing.data_manager import load_dataset, load_pipeline, pipeline_file_name
+
+    if (TRAINED_MODEL_DIR / pipeline_file_name()).is_file():
+        pipeline = load_pipeline(file_name=pipeline_file_name())
+    else:
+        data = load_dataset(file_name=config.app_config_.training_data_file)
+        pipeline = build_bikeshare_pipe().fit(data[config.model_config_.features], data[config.model_config_.target])
+
+    if compiled:
+        from bikeshare_model.compiled_forest import compile_pipeline
+        pipeline = compile_pipeline(pipeline)
+    return pipeline
+
+
+def run_benchmark(*, compiled: bool, repeat: int) -> t.List[dict]:
+    import joblib
+
+    from bikeshare_model.processing.data_manager import write_manifest
+
+    pipeline = _source_pipeline(compiled=compiled)
+    report = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, compression, mmap_mode in FORMATS:
+            path = Path(tmp_dir) / f"{name.replace('_mmap', '')}.pkl"
+            if not path.exists():
+                start = time.perf_counter()
+                joblib.dump(pipeline, path, compress=compression or 0)
+                save_seconds = time.perf_counter() - start
+                manifest = write_manifest(pipeline=pipeline, file_name=str(path), compression=compression)
+
+            loads = []
+            for _ in range(repeat):
+                command = [sys.executable, str(file), "--load", str(path)]
+                if mmap_mode:
+                    command += ["--mmap-mode", mmap_mode]
+                output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+                loads.append(json.loads(output.strip().splitlines()[-1]))
+
+            report.append({
+                "format": name,
+                "size_mb": manifest["size_bytes"] / 1e6,
+                "save_seconds": save_seconds,
+                "load_seconds": min(load["load_seconds"] for load in loads),
+                "rss_mb": min(load["rss_mb"] for load in loads),
+                "private_mb": min(load["private_mb"] for load in loads),
+            })
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compiled", action="store_true", help="store the forest as a CompiledForest")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--load", help=argparse.SUPPRESS)
+    parser.add_argument("--mmap-mode", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.load:
+        print(json.dumps(load_artifact(path=args.load, mmap_mode=args.mmap_mode)))
+        return
+
+    report = run_benchmark(compiled=args.compiled, repeat=args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'format':<20}{'size MB':>10}{'save s':>9}{'load s':>9}{'RSS MB':>9}{'private MB':>12}")
+    for row in report:
+        print(f"{row['format']:<20}{row['size_mb']:>10.1f}{row['save_seconds']:>9.2f}{row['load_seconds']:>9.3f}"
+              f"{row['rss_mb']:>9.1f}{row['private_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Default (float64) against compact (float32) feature matrices, end to end.
+
+Fits the pipeline both ways on the train split of the bundled dataset
+(build_bikeshare_pipe(compact=...), the compact_features switch in
+config.yml) and reports, per model type:
+
+- the size of the transformed test features and the traced peak memory of
+  transforming them;
+- preprocessing, fit and batch/single-row predict times;
+- test R-squared and MSE, their compact - default deltas, and the share of
+  test rows both modes predict identically.
+
+Forests work on float32 internally, so for them the deltas should be zero.
+
+    python benchmarks/bench_compact_features.py --model-type random_forest_regressor
+"""
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import argparse
+import json
+import time
+import tracemalloc
+import typing as t
+
+import numpy as np
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+
+from bikeshare_model.config.core import config
+from bikeshare_model.pipeline import MODEL_TYPES, build_bikeshare_pipe
+from bikeshare_model.processing.data_manager import load_dataset
+
+
+def _best_of(func: t.Callable[[], t.Any], *, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _traced_peak_mb(func: t.Callable[[], t.Any]) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def run_mode(*, compact: bool, model_type: str, repeat: int, data: t.Tuple) -> t.Tuple[dict, np.ndarray]:
+    X_train, X_test, y_train, y_test = data
+    pipeline = build_bikeshare_pipe(model_type=model_type, compact=compact)
+    preprocessing = pipeline[:-1]
+
+    preprocess_seconds = _best_of(lambda: preprocessing.fit_transform(X_train, y_train), repeat=repeat)
+    features = preprocessing.transform(X_test)
+    start = time.perf_counter()
+    pipeline[-1].fit(preprocessing.transform(X_train), y_train)
+    fit_seconds = time.perf_counter() - start
+
+    y_pred = pipeline.predict(X_test)
+    return {
+        "model_type": model_type,
+        "mode": "compact" if compact else "default",
+        "dtypes": sorted({str(dtype) for dtype in features.dtypes}),
+        "test_features_mb": features.memory_usage(index=False).sum() / 1e6,
+        "transform_peak_mb": _traced_peak_mb(lambda: preprocessing.transform(X_test)),
+        "preprocess_seconds": preprocess_seconds,
+        "fit_seconds": fit_seconds,
+        "predict_seconds": _best_of(lambda: pipeline.predict(X_test), repeat=repeat),
+        "single_row_ms": _best_of(lambda: pipeline.predict(X_test.iloc[:1]), repeat=repeat * 10) * 1000,
+        "r2": r2_score(y_test, y_pred),
+        "mse": mean_squared_error(y_test, y_pred),
+    }, y_pred
+
+
+def run_benchmark(*, model_types: t.Sequence[str], repeat: int) -> t.List[dict]:
+    data = load_dataset(file_name=config.app_config_.training_data_file)
+    split = train_test_split(
+        data[config.model_config_.features], data[config.model_config_.target],
+        test_size=config.model_config_.test_size, random_state=config.model_config_.random_state,
+    )
+
+    report = []
+    for model_type in model_types:
+        default, default_pred = run_mode(compact=False, model_type=model_type, repeat=repeat, data=split)
+        compact, compact_pred = run_mode(compact=True, model_type=model_type, repeat=repeat, data=split)
+        compact["r2_delta"] = compact["r2"] - default["r2"]
+        compact["mse_delta"] = compact["mse"] - default["mse"]
+        compact["identical_predictions"] = float(np.mean(compact_pred == default_pred))
+        report.extend([default, compact])
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-type", nargs="+", choices=MODEL_TYPES, default=list(MODEL_TYPES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = run_benchmark(model_types=args.model_type, repeat=args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'model type':>33}{'mode':>9}{'feat MB':>9}{'peak MB':>9}{'prep s':>8}{'fit s':>7}"
+          f"{'pred s':>8}{'1 row ms':>10}{'r2':>8}{'mse':>10}{'identical':>11}")
+    for row in report:
+        identical = f"{row['identical_predictions']:.1%}" if "identical_predictions" in row else ""
+        print(f"{row['model_type']:>33}{row['mode']:>9}{row['test_features_mb']:>9.2f}{row['transform_peak_mb']:>9.2f}"
+              f"{row['preprocess_seconds']:>8.3f}{row['fit_seconds']:>7.2f}{row['predict_seconds']:>8.3f}"
+              f"{row['single_row_ms']:>10.2f}{row['r2']:>8.4f}{row['mse']:>10.1f}{identical:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Fused NumPy preprocessing versus the pandas transformer steps.
+
+Times the fitted preprocessing steps (pipeline[:-1].transform) against
+CompiledPreprocessor.transform_array, and the full predict call with each,
+for single rows and for a large batch resampled from the bundled dataset.
+The compiled output is checked to be identical before timing.
+
+    python benchmarks/bench_compiled_preprocessing.py --batch-rows 100000
+"""
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import argparse
+import json
+import time
+import typing as t
+
+import numpy as np
+
+from bikeshare_model.compiled_preprocessing import compile_preprocessing
+from bikeshare_model.config.core import TRAINED_MODEL_DIR, config
+from bikeshare_model.pipeline import build_bikeshare_pipe
+from bikeshare_model.processing.data_manager import load_dataset, load_pipeline, pipeline_file_name
+
+
+def _best_of(func: t.Callable[[], t.Any], *, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _median_latency(func: t.Callable[[t.Any], t.Any], rows: t.List[t.Any]) -> float:
+    latencies = []
+    for row in rows:
+        start = time.perf_counter()
+        func(row)
+        latencies.append(time.perf_counter() - start)
+    return float(np.median(latencies))
+
+
+def run_benchmark(*, batch_rows: int, single_row_calls: int, repeat: int) -> dict:
+    data = load_dataset(file_name=config.app_config_.training_data_file)
+    X = data[config.model_config_.features]
+    if (TRAINED_MODEL_DIR / pipeline_file_name()).is_file():
+        pipeline = load_pipeline(file_name=pipeline_file_name())
+    else:
+        pipeline = build_bikeshare_pipe().fit(X, data[config.model_config_.target])
+    compiled = compile_preprocessing(pipeline)
+    preprocessing, fused = pipeline[:-1], compiled[0]
+
+    batch = X.sample(n=batch_rows, replace=True, random_state=config.model_config_.random_state)
+    expected = preprocessing.transform(batch)[list(fused.feature_names_out_)].to_numpy(dtype=np.float32)
+    np.testing.assert_array_equal(fused.transform_array(batch), expected)
+
+    rows = [X.iloc[[i % len(X)]] for i in range(single_row_calls)]
+    out = np.empty((batch_rows, fused.n_features_out_), dtype=np.float32)
+    return {
+        "batch_rows": batch_rows,
+        "batch_transform_pandas_ms": _best_of(lambda: preprocessing.transform(batch), repeat=repeat) * 1000,
+        "batch_transform_fused_ms": _best_of(lambda: fused.transform_array(batch, out=out), repeat=repeat) * 1000,
+        "batch_predict_pandas_ms": _best_of(lambda: pipeline.predict(batch), repeat=repeat) * 1000,
+        "batch_predict_fused_ms": _best_of(lambda: compiled.predict(batch), repeat=repeat) * 1000,
+        "single_row_transform_pandas_ms": _median_latency(preprocessing.transform, rows) * 1000,
+        "single_row_transform_fused_ms": _median_latency(fused.transform_array, rows) * 1000,
+        "single_row_predict_pandas_ms": _median_latency(pipeline.predict, rows) * 1000,
+        "single_row_predict_fused_ms": _median_latency(compiled.predict, rows) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-rows", type=int, default=100_000)
+    parser.add_argument("--single-row-calls", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    result = run_benchmark(batch_rows=args.batch_rows, single_row_calls=args.single_row_calls, repeat=args.repeat)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
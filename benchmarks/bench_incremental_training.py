@@ -0,0 +1,105 @@
+"""
+Wall time of an incremental retrain against a full retrain.
+
+The bundled dataset is ordered by row timestamp and its last --new-days
+days are held back as the "appended" rows. A pipeline is fitted on the
+older rows, then the new rows are taken in either by refitting the whole
+pipeline on all rows, or incrementally: select the rows after the
+watermark, merge them into the preprocessing state and add
+warm_start_n_estimators estimators (what train_pipeline --incremental does,
+without the artifact I/O).
+
+A classifier can only warm-start on target values it has already seen, so
+for the default model new rows with unseen counts are skipped, exactly as
+train_pipeline --incremental skips them (see new_rows_used).
+
+    python benchmarks/bench_incremental_training.py --new-days 1 7 30
+"""
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import argparse
+import copy
+import json
+import time
+import typing as t
+
+import pandas as pd
+
+from bikeshare_model.config.core import config
+from bikeshare_model.pipeline import build_bikeshare_pipe
+from bikeshare_model.processing.data_manager import load_dataset, row_timestamps
+from bikeshare_model.train_pipeline import known_target_rows, update_preprocessing, warm_start_fit
+
+
+def _best_of(func: t.Callable[[], t.Any], *, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark(*, new_days: t.Sequence[int], repeat: int, model_type: t.Optional[str] = None) -> t.List[dict]:
+    data = load_dataset(file_name=config.app_config_.training_data_file)
+    features, target = config.model_config_.features, config.model_config_.target
+    timestamps = row_timestamps(data)
+
+    report = []
+    for days in new_days:
+        watermark = timestamps.max() - pd.Timedelta(days=days)
+        old = data[(timestamps <= watermark).to_numpy()]
+        base = build_bikeshare_pipe(model_type=model_type).fit(old[features], old[target])
+
+        # the deep copy of the fitted base pipeline is not part of the timing
+        timings, rows_used = [], []
+        for _ in range(repeat):
+            pipeline = copy.deepcopy(base)
+            start = time.perf_counter()
+            new = data[(row_timestamps(data) > watermark).to_numpy()]
+            new = new[known_target_rows(model=pipeline[-1], y=new[target])]
+            X = update_preprocessing(preprocessing=pipeline[:-1], X=new[features])
+            warm_start_fit(model=pipeline[-1], X=X, y=new[target],
+                           n_new_estimators=config.model_config_.warm_start_n_estimators)
+            timings.append(time.perf_counter() - start)
+            rows_used.append(len(new))
+
+        report.append({
+            "new_days": days,
+            "old_rows": len(old),
+            "new_rows": int((timestamps > watermark).sum()),
+            "new_rows_used": rows_used[0],
+            "full_retrain_seconds": _best_of(
+                lambda: build_bikeshare_pipe(model_type=model_type).fit(data[features], data[target]), repeat=repeat
+            ),
+            "incremental_seconds": min(timings),
+        })
+        report[-1]["speedup"] = report[-1]["full_retrain_seconds"] / report[-1]["incremental_seconds"]
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--new-days", type=int, nargs="+", default=[1, 7, 30])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--model-type", help="model_type to benchmark (default: config.yml)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = run_benchmark(new_days=args.new_days, repeat=args.repeat, model_type=args.model_type)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'new days':>9}{'old rows':>10}{'new rows':>10}{'used':>7}{'full s':>9}{'incremental s':>15}{'speedup':>9}")
+    for row in report:
+        print(f"{row['new_days']:>9}{row['old_rows']:>10}{row['new_rows']:>10}{row['new_rows_used']:>7}"
+              f"{row['full_retrain_seconds']:>9.2f}{row['incremental_seconds']:>15.3f}{row['speedup']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
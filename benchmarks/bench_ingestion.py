@@ -0,0 +1,89 @@
+"""
+Load time and memory footprint of the dataset formats.
+
+The bundled CSV is replicated --replicate times and read back as a CSV with
+inferred dtypes, as a CSV with the configured dtypes, and from the typed
+binary copies (pickle, plus Parquet and Feather when pyarrow is installed).
+
+    python benchmarks/bench_ingestion.py --replicate 10
+"""
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import argparse
+import importlib.util
+import json
+import tempfile
+import time
+import typing as t
+
+import pandas as pd
+
+from bikeshare_model.config.core import DATASET_DIR, config
+from bikeshare_model.processing.data_manager import read_dataset
+
+
+def _best_of(func: t.Callable[[], pd.DataFrame], *, repeat: int) -> t.Tuple[float, pd.DataFrame]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dataframe = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), dataframe
+
+
+def run_benchmark(*, replicate: int, repeat: int) -> t.List[dict]:
+    source = pd.read_csv(DATASET_DIR / config.app_config_.training_data_file)
+    report = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = Path(tmp_dir) / "dataset.csv"
+        pd.concat([source] * replicate, ignore_index=True).to_csv(csv_path, index=False)
+        typed = read_dataset(csv_path)
+
+        readers = {
+            "csv_inferred": (csv_path, lambda: pd.read_csv(csv_path)),
+            "csv_typed": (csv_path, lambda: read_dataset(csv_path)),
+        }
+        binary_formats = {"pickle": typed.to_pickle}
+        if importlib.util.find_spec("pyarrow") is not None:
+            binary_formats.update(parquet=lambda path: typed.to_parquet(path, index=False), feather=typed.to_feather)
+        for name, write in binary_formats.items():
+            path = csv_path.with_suffix({"pickle": ".pkl"}.get(name, f".{name}"))
+            write(path)
+            readers[name] = (path, lambda path=path: read_dataset(path))
+
+        for name, (path, read) in readers.items():
+            seconds, dataframe = _best_of(read, repeat=repeat)
+            report.append({
+                "format": name,
+                "rows": len(dataframe),
+                "file_mb": path.stat().st_size / 1e6,
+                "load_seconds": seconds,
+                "memory_mb": dataframe.memory_usage(deep=True).sum() / 1e6,
+            })
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replicate", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = run_benchmark(replicate=args.replicate, repeat=args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'format':<14}{'rows':>10}{'file MB':>10}{'load s':>9}{'memory MB':>11}")
+    for row in report:
+        print(f"{row['format']:<14}{row['rows']:>10}{row['file_mb']:>10.1f}{row['load_seconds']:>9.3f}"
+              f"{row['memory_mb']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Peak RSS of the bikeshare preprocessing steps per 1M rows.
+
+Compares every transformer copying its input (copy=True on each step, the old
+behaviour) with the pipeline's copy-once mode. Each mode runs in a fresh
+interpreter so peak readings do not leak between runs.
+
+    python benchmarks/bench_memory.py --rows 1000000
+"""
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import argparse
+import json
+import resource
+import subprocess
+
+MODES = ("copy_per_step", "copy_once")
+
+
+def _rss_mb(field: str) -> float:
+    """Read VmRSS/VmHWM from /proc, falling back to getrusage peak."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _reset_peak_rss() -> None:
+    """Reset VmHWM so the peak covers only the measured section (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def run_mode(*, mode: str, rows: int) -> dict:
+    """Fit-transform the preprocessing steps on `rows` resampled rows."""
+    import gc
+
+    from bikeshare_model.config.core import config
+    from bikeshare_model.pipeline import build_bikeshare_pipe
+    from bikeshare_model.processing.data_manager import load_dataset
+
+    data = load_dataset(file_name=config.app_config_.training_data_file)
+    X = data.sample(n=rows, replace=True, random_state=config.model_config_.random_state)
+    X = X[config.model_config_.features].reset_index(drop=True)
+    del data
+    gc.collect()
+
+    preprocessing = build_bikeshare_pipe()[:-1]
+    if mode == "copy_per_step":
+        preprocessing.set_params(**{f"{name}__copy": True for name, _ in preprocessing.steps})
+
+    _reset_peak_rss()
+    start_rss = _rss_mb("VmRSS")
+    preprocessing.fit_transform(X)
+    peak_rss = _rss_mb("VmHWM")
+
+    return {
+        "mode": mode,
+        "rows": rows,
+        "start_rss_mb": round(start_rss, 1),
+        "peak_rss_mb": round(peak_rss, 1),
+        "peak_delta_mb_per_1m_rows": round((peak_rss - start_rss) * 1_000_000 / rows, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--mode", choices=MODES, help="run a single mode in this process")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(mode=args.mode, rows=args.rows)))
+        return
+
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, str(file), "--mode", mode, "--rows", str(args.rows)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:>14}: peak RSS +{result['peak_delta_mb_per_1m_rows']} MB per 1M rows "
+              f"(start {result['start_rss_mb']} MB, peak {result['peak_rss_mb']} MB)")
+
+
+if __name__ == "__main__":
+    main()
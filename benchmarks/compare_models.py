@@ -0,0 +1,89 @@
+"""
+Compare the configurable model types on the bundled dataset.
+
+For each model_type the full pipeline is fitted on the configured train
+split and the report lists fit time, pickled model size, single-row and
+batch predict latency and test-set R^2 / MSE.
+
+    python benchmarks/compare_models.py [--model-types random_forest_regressor ...]
+"""
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import argparse
+import json
+import pickle
+import time
+import typing as t
+
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+
+from bikeshare_model.config.core import config
+from bikeshare_model.pipeline import MODEL_TYPES, build_bikeshare_pipe
+from bikeshare_model.processing.data_manager import load_dataset
+
+
+def _best_of(func: t.Callable[[], t.Any], *, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def compare_models(*, model_types: t.Sequence[str] = MODEL_TYPES, repeat: int = 5) -> t.List[dict]:
+    data = load_dataset(file_name=config.app_config_.training_data_file)
+    X_train, X_test, y_train, y_test = train_test_split(
+        data[config.model_config_.features],
+        data[config.model_config_.target],
+        test_size=config.model_config_.test_size,
+        random_state=config.model_config_.random_state,
+    )
+
+    report = []
+    for model_type in model_types:
+        pipeline = build_bikeshare_pipe(model_type=model_type)
+        start = time.perf_counter()
+        pipeline.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+
+        y_pred = pipeline.predict(X_test)
+        single_row = X_test.iloc[[0]]
+        report.append({
+            "model_type": model_type,
+            "fit_seconds": fit_seconds,
+            "model_size_mb": len(pickle.dumps(pipeline[-1])) / 1e6,
+            "predict_single_ms": _best_of(lambda: pipeline.predict(single_row), repeat=repeat) * 1000,
+            "predict_batch_ms": _best_of(lambda: pipeline.predict(X_test), repeat=repeat) * 1000,
+            "batch_rows": len(X_test),
+            "r2": r2_score(y_test, y_pred),
+            "mse": mean_squared_error(y_test, y_pred),
+        })
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-types", nargs="+", default=list(MODEL_TYPES), choices=MODEL_TYPES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = compare_models(model_types=args.model_types, repeat=args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'model_type':<34}{'fit s':>8}{'size MB':>10}{'1 row ms':>10}{'batch ms':>10}{'R^2':>8}")
+    for row in report:
+        print(f"{row['model_type']:<34}{row['fit_seconds']:>8.2f}{row['model_size_mb']:>10.2f}"
+              f"{row['predict_single_ms']:>10.2f}{row['predict_batch_ms']:>10.1f}{row['r2']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
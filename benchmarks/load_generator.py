@@ -0,0 +1,134 @@
+"""
+Load generator for the micro-batching prediction server.
+
+Fires single-record requests drawn from the bundled dataset with a fixed
+number of concurrent clients and reports p50/p99 latency and throughput.
+By default it starts the server in-process on a free port and talks to it
+over HTTP; --target host:port drives an already running server and
+--in-process calls the MicroBatcher directly, skipping HTTP.
+
+    python benchmarks/load_generator.py --requests 2000 --concurrency 32
+"""
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import argparse
+import asyncio
+import json
+import time
+import typing as t
+
+import numpy as np
+import pandas as pd
+
+from bikeshare_model.config.core import DATASET_DIR, config
+from bikeshare_model.serving import MicroBatcher, start_server
+
+
+def sample_records(*, n: int) -> t.List[dict]:
+    """Single-record payloads drawn from the bundled dataset."""
+    data = pd.read_csv(DATASET_DIR / config.app_config_.training_data_file)
+    features = [column for column in config.model_config_.features if column in data.columns]
+    sample = data.sample(n=n, replace=True, random_state=config.model_config_.random_state)[features]
+    return json.loads(sample.to_json(orient="records"))
+
+
+async def _http_client(host: str, port: int, records: t.List[dict], latencies: t.List[float]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for record in records:
+            body = json.dumps(record).encode()
+            start = time.perf_counter()
+            writer.write(
+                f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            headers = {}
+            await reader.readline()
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            await reader.readexactly(int(headers["content-length"]))
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def _in_process_client(batcher: MicroBatcher, records: t.List[dict], latencies: t.List[float]) -> None:
+    for record in records:
+        start = time.perf_counter()
+        await batcher.predict(record)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_load(
+    *, requests: int, concurrency: int, target: t.Optional[str], in_process: bool,
+    max_batch_size: int, max_wait_ms: float,
+) -> dict:
+    records = sample_records(n=requests)
+    shares = [records[i::concurrency] for i in range(concurrency)]
+    latencies: t.List[float] = []
+
+    server, batcher = None, None
+    if target:
+        host, port = target.rsplit(":", 1)
+    else:
+        batcher = MicroBatcher(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        # warm up so the model load is not counted
+        await batcher.predict(records[0])
+        batcher.stats.update(requests=0, batches=0)
+        if not in_process:
+            server, batcher = await start_server(host="127.0.0.1", port=0, batcher=batcher)
+            host, port = "127.0.0.1", server.sockets[0].getsockname()[1]
+
+    start = time.perf_counter()
+    if in_process and batcher is not None:
+        await asyncio.gather(*(_in_process_client(batcher, share, latencies) for share in shares))
+    else:
+        await asyncio.gather(*(_http_client(host, int(port), share, latencies) for share in shares))
+    seconds = time.perf_counter() - start
+
+    result = {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "seconds": seconds,
+        "throughput_rps": len(latencies) / seconds,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+    }
+    if batcher is not None:
+        result["mean_batch_size"] = batcher.stats["requests"] / max(batcher.stats["batches"], 1)
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+    if batcher is not None:
+        await batcher.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--target", help="host:port of a running server (default: start one in-process)")
+    parser.add_argument("--in-process", action="store_true", help="call the MicroBatcher directly, without HTTP")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load(
+        requests=args.requests, concurrency=args.concurrency, target=args.target, in_process=args.in_process,
+        max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+    ))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
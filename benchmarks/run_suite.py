@@ -0,0 +1,212 @@
+"""
+Performance regression suite for preprocessing, training and inference.
+
+For each data size, synthetic rows (benchmarks/synthetic_data.py) are timed
+through pre_pipeline_preparation, validate_inputs, every preprocessing step
+(fit_transform and transform), the model fit and predict, the full pipeline
+fit, batch predict and single-row predict latency. Each timing is the best
+of --repeat runs; single-row latency is the median/p99 over --single-row-calls.
+
+Results are written as JSON (--output) and compared with a stored baseline
+(benchmarks/baseline.json by default). A benchmark regresses when it is more
+than --threshold slower than the baseline and by at least --min-delta-ms;
+any regression makes the exit status 1 (p99 latency is reported only).
+Timings only compare on the same hardware: --update-baseline stores the
+run as the new baseline.
+
+    python benchmarks/run_suite.py --sizes 1000 10000 100000 --output results.json
+"""
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import argparse
+import contextlib
+import gc
+import json
+import platform
+import time
+import typing as t
+
+import numpy as np
+import sklearn
+
+from bikeshare_model import __version__ as _version
+from bikeshare_model.config.core import config
+from bikeshare_model.pipeline import build_bikeshare_pipe
+from bikeshare_model.processing.data_manager import pre_pipeline_preparation
+from bikeshare_model.processing.validation import validate_inputs
+from bikeshare_model.profiling import PipelineProfiler
+from synthetic_data import generate_bikeshare_data
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_BASELINE = parent / "baseline.json"
+# Reported, but too noisy to fail the run on
+INFORMATIONAL = ("single_row_predict_p99",)
+
+
+@contextlib.contextmanager
+def _quiet_gc() -> t.Iterator[None]:
+    """Collect first and keep the garbage collector out of the timed code, as timeit does."""
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+def _best_of(func: t.Callable[[], t.Any], *, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        with _quiet_gc():
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _build_pipeline(*, model_type: t.Optional[str], n_estimators: int):
+    pipeline = build_bikeshare_pipe(model_type=model_type)
+    size_param = "max_iter" if "max_iter" in pipeline[-1].get_params() else "n_estimators"
+    return pipeline.set_params(**{f"{pipeline.steps[-1][0]}__{size_param}": n_estimators})
+
+
+def run_size(
+    *, n_rows: int, repeat: int, single_row_calls: int, model_type: t.Optional[str], n_estimators: int,
+) -> t.Dict[str, float]:
+    """Seconds per benchmark for one data size."""
+
+    raw = generate_bikeshare_data(n_rows=n_rows, random_state=config.model_config_.random_state)
+    results = {
+        "pre_pipeline_preparation": _best_of(lambda: pre_pipeline_preparation(data_frame=raw.copy()), repeat=repeat),
+    }
+    data = pre_pipeline_preparation(data_frame=raw)
+    X, y = data[config.model_config_.features].copy(), data[config.model_config_.target]
+    results["validate_inputs"] = _best_of(lambda: validate_inputs(input_df=X), repeat=repeat)
+
+    # per-step timings, best of repeat for every step
+    step_timings: t.Dict[str, t.List[float]] = {}
+    profiler = PipelineProfiler(
+        callback=lambda entry: step_timings.setdefault(f"{entry['method']}/{entry['step']}", []).append(entry["seconds"])
+    )
+    for _ in range(repeat):
+        pipeline = _build_pipeline(model_type=model_type, n_estimators=n_estimators)
+        with _quiet_gc():
+            profiler.fit(pipeline, X, y)
+            profiler.predict(pipeline, X)
+    results.update({name: min(timings) for name, timings in step_timings.items()})
+
+    results["pipeline_fit"] = _best_of(
+        lambda: _build_pipeline(model_type=model_type, n_estimators=n_estimators).fit(X, y), repeat=repeat
+    )
+    results["batch_predict"] = _best_of(lambda: pipeline.predict(X), repeat=repeat)
+
+    rows = [X.iloc[[i % len(X)]] for i in range(single_row_calls)]
+    latencies = []
+    with _quiet_gc():
+        for row in rows:
+            start = time.perf_counter()
+            pipeline.predict(row)
+            latencies.append(time.perf_counter() - start)
+    results["single_row_predict_p50"] = float(np.percentile(latencies, 50))
+    results["single_row_predict_p99"] = float(np.percentile(latencies, 99))
+    return results
+
+
+def run_suite(
+    *, sizes: t.Sequence[int], repeat: int = 5, single_row_calls: int = 200,
+    model_type: t.Optional[str] = None, n_estimators: int = 20,
+) -> dict:
+    return {
+        "meta": {
+            "package_version": _version,
+            "python": platform.python_version(),
+            "sklearn": sklearn.__version__,
+            "machine": platform.machine(),
+            "model_type": model_type or config.model_config_.model_type,
+            "n_estimators": n_estimators,
+            "repeat": repeat,
+        },
+        "results": {
+            str(n_rows): run_size(
+                n_rows=n_rows, repeat=repeat, single_row_calls=single_row_calls,
+                model_type=model_type, n_estimators=n_estimators,
+            )
+            for n_rows in sizes
+        },
+    }
+
+
+def compare_to_baseline(
+    *, results: dict, baseline: dict, threshold: float, min_delta_seconds: float,
+) -> t.List[dict]:
+    """Every benchmark present in both runs, flagged when it regressed."""
+
+    comparison = []
+    for size, benchmarks in results["results"].items():
+        for name, seconds in benchmarks.items():
+            baseline_seconds = baseline["results"].get(size, {}).get(name)
+            if baseline_seconds is None:
+                continue
+            comparison.append({
+                "rows": int(size),
+                "benchmark": name,
+                "seconds": seconds,
+                "baseline_seconds": baseline_seconds,
+                "ratio": seconds / baseline_seconds if baseline_seconds else float("inf"),
+                "regressed": name not in INFORMATIONAL
+                             and seconds > baseline_seconds * (1 + threshold)
+                             and seconds - baseline_seconds >= min_delta_seconds,
+            })
+    return comparison
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="synthetic rows per run, e.g. 1000 ... 10000000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--single-row-calls", type=int, default=200)
+    parser.add_argument("--model-type", help="model_type to benchmark (default: config.yml)")
+    parser.add_argument("--n-estimators", type=int, default=20, help="trees (or boosting iterations) per model")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="allowed slowdown, as a fraction (tighten it on a quiet, dedicated machine)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args()
+
+    results = run_suite(
+        sizes=args.sizes, repeat=args.repeat, single_row_calls=args.single_row_calls,
+        model_type=args.model_type, n_estimators=args.n_estimators,
+    )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not args.baseline.is_file():
+        print(json.dumps(results, indent=2))
+        return
+
+    comparison = compare_to_baseline(
+        results=results, baseline=json.loads(args.baseline.read_text()),
+        threshold=args.threshold, min_delta_seconds=args.min_delta_ms / 1000,
+    )
+    print(f"{'rows':>9}  {'benchmark':<42}{'ms':>10}{'baseline':>10}{'ratio':>7}")
+    for row in comparison:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(f"{row['rows']:>9}  {row['benchmark']:<42}{row['seconds'] * 1000:>10.2f}"
+              f"{row['baseline_seconds'] * 1000:>10.2f}{row['ratio']:>7.2f}{flag}")
+    if any(row["regressed"] for row in comparison):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Scaled synthetic bikeshare data drawn from the bundled dataset.
+
+Rows are resampled from the bundled CSV, so the categorical mix, the
+missing weekday/weathersit rates and the joint structure of the columns
+are kept. The weather measurements get a little Gaussian noise (clipped
+to the observed range) so large samples are not just exact repeats.
+
+    python benchmarks/synthetic_data.py --rows 1000000 --output /tmp/bikeshare_1m.csv
+"""
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from bikeshare_model.config.core import config
+from bikeshare_model.processing.data_manager import load_raw_dataset
+
+# Continuous columns that get noise, and its scale relative to the column's std
+NOISY_COLUMNS = ("temp", "atemp", "hum", "windspeed")
+NOISE_SCALE = 0.05
+
+
+def generate_bikeshare_data(*, n_rows: int, random_state: int = 0) -> pd.DataFrame:
+    """n_rows synthetic raw rows with the bundled dataset's columns and dtypes."""
+
+    source = load_raw_dataset(file_name=config.app_config_.training_data_file)
+    rng = np.random.default_rng(random_state)
+
+    data = source.iloc[rng.integers(0, len(source), size=n_rows)].reset_index(drop=True).copy()
+    for column in NOISY_COLUMNS:
+        values = data[column].to_numpy()
+        noise = rng.normal(0.0, NOISE_SCALE * float(source[column].std()), size=n_rows)
+        data[column] = np.clip(values + noise, source[column].min(), source[column].max()).astype(values.dtype)
+    return data
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--random-state", type=int, default=0)
+    parser.add_argument("--output", type=Path, required=True, help="CSV, or .pkl for a typed pickle")
+    args = parser.parse_args()
+
+    data = generate_bikeshare_data(n_rows=args.rows, random_state=args.random_state)
+    if args.output.suffix == ".pkl":
+        data.to_pickle(args.output)
+    else:
+        data.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
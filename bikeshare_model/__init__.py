@@ -1,11 +1,18 @@
-import sys
+import importlib
 from pathlib import Path
-file = Path(__file__).resolve()
-parent, root = file.parent, file.parents[1]
-sys.path.append(str(root))
 
-
-from bikeshare_model.config.core import PACKAGE_ROOT, config
-with open(PACKAGE_ROOT / "VERSION") as version_file:
+with open(Path(__file__).resolve().parent / "VERSION") as version_file:
     __version__ = version_file.read().strip()
-    
\ No newline at end of file
+
+# Submodules are imported on first access (e.g. bikeshare_model.predict), so
+# importing the package only reads VERSION
+_SUBMODULES = {
+    "batch_predict", "compiled_forest", "compiled_preprocessing", "config", "pipeline", "predict",
+    "prediction_cache", "processing", "profiling", "serving", "train_pipeline", "tune_pipeline",
+}
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,240 @@
+import argparse
+import json
+import os
+import time
+import typing as t
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+from bikeshare_model import __version__ as _version
+from bikeshare_model.config.core import config
+from bikeshare_model.processing.data_manager import get_pipeline, load_pipeline, pipeline_file_name
+from bikeshare_model.processing.validation import validate_inputs
+
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+
+# Pipeline loaded once per worker process by _init_worker
+_worker_pipeline: t.Optional[Pipeline] = None
+
+
+def _require_pyarrow() -> t.Any:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError("Reading or writing Parquet files requires pyarrow (pip install pyarrow).") from error
+    return pyarrow
+
+
+def iter_input_chunks(*, input_path: Path, chunk_size: int) -> t.Iterator[pd.DataFrame]:
+    """Read a CSV or Parquet file in chunks of at most chunk_size rows."""
+
+    if input_path.suffix in PARQUET_SUFFIXES:
+        pyarrow = _require_pyarrow()
+        parquet_file = pyarrow.parquet.ParquetFile(input_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_size)
+
+
+class PredictionWriter:
+    """Append prediction chunks to a CSV or Parquet file as they are produced."""
+
+    def __init__(self, output_path: Path):
+        self.output_path = output_path
+        self._parquet_writer: t.Any = None
+        self._header_written = False
+
+    def write(self, predictions: pd.DataFrame) -> None:
+        if self.output_path.suffix in PARQUET_SUFFIXES:
+            pyarrow = _require_pyarrow()
+            table = pyarrow.Table.from_pandas(predictions, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pyarrow.parquet.ParquetWriter(self.output_path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            predictions.to_csv(self.output_path, mode="a" if self._header_written else "w",
+                               header=not self._header_written, index=False)
+            self._header_written = True
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def _init_worker(pipeline: t.Optional[Pipeline]) -> None:
+    """Load the pipeline once per worker, memory-mapping the saved pickle."""
+    global _worker_pipeline
+    _worker_pipeline = pipeline if pipeline is not None else load_pipeline(file_name=pipeline_file_name(), mmap_mode="r")
+
+    # parallelism comes from the pool, so each worker's model predicts on one core
+    model = _worker_pipeline[-1]
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=1)
+
+
+def _score_chunk(
+    chunk: pd.DataFrame, pipeline: t.Optional[Pipeline] = None
+) -> t.Tuple[np.ndarray, np.ndarray, t.Optional[str]]:
+    """Validate and score one chunk.
+    Returns the positions of the valid rows, their predictions and the errors
+    of the invalid rows (loc = ["inputs", position in the chunk, column]).
+    """
+    validated_data, errors = validate_inputs(input_df=chunk)
+
+    valid = np.ones(len(validated_data), dtype=bool)
+    for error in json.loads(errors) if errors else []:
+        valid[error["loc"][1]] = False
+    valid_rows = np.flatnonzero(valid)
+    if not len(valid_rows):
+        return valid_rows, np.array([]), errors
+
+    pipeline = pipeline if pipeline is not None else _worker_pipeline
+    valid_data = validated_data.iloc[valid_rows].reindex(columns=config.model_config_.features)
+    return valid_rows, pipeline.predict(valid_data), errors
+
+
+def _iter_scored_chunks(
+    chunks: t.Iterable[pd.DataFrame], *, pipeline: t.Optional[Pipeline], n_workers: int
+) -> t.Iterator[t.Tuple[int, np.ndarray, np.ndarray, t.Optional[str]]]:
+    """Score chunks in order, in-process or sharded across a process pool.
+    The pool keeps at most two chunks per worker in flight so memory stays bounded.
+    """
+
+    if n_workers <= 1:
+        if pipeline is None:
+            pipeline = get_pipeline()
+        for chunk in chunks:
+            yield (len(chunk), *_score_chunk(chunk, pipeline))
+        return
+
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(pipeline,)) as pool:
+        pending: t.Deque = deque()
+        for chunk in chunks:
+            pending.append((len(chunk), pool.submit(_score_chunk, chunk)))
+            if len(pending) >= 2 * n_workers:
+                n_rows, future = pending.popleft()
+                yield (n_rows, *future.result())
+        while pending:
+            n_rows, future = pending.popleft()
+            yield (n_rows, *future.result())
+
+
+def predict_parallel(
+    *,
+    input_data: t.Union[pd.DataFrame, dict],
+    n_workers: t.Optional[int] = None,
+    shard_size: t.Optional[int] = None,
+    pipeline: t.Optional[Pipeline] = None,
+) -> dict:
+    """Make predictions for an in-memory frame by sharding it across a process pool.
+    Predictions come back in the original row order. Rows that fail validation
+    get NaN predictions and their errors are collected in the result, with
+    loc[1] the row's position in input_data.
+    """
+
+    input_df = pd.DataFrame(input_data).reset_index(drop=True)
+    n_workers = n_workers or os.cpu_count() or 1
+    shard_size = shard_size or max(1, -(-len(input_df) // n_workers))
+    # copies, because validate_inputs prepares the shard frames in place
+    shards = (input_df.iloc[start:start + shard_size].copy() for start in range(0, len(input_df), shard_size))
+
+    predictions, errors, first_row = [], [], 0
+    scored = _iter_scored_chunks(shards, pipeline=pipeline, n_workers=n_workers)
+    for n_rows, valid_rows, shard_predictions, shard_errors in scored:
+        if shard_errors:
+            # error rows are positions within the shard; make them positions within the input
+            shard_error_list = json.loads(shard_errors)
+            for error in shard_error_list:
+                error["loc"][1] += first_row
+            errors.append(json.dumps(shard_error_list))
+            all_rows = np.full(n_rows, np.nan)
+            all_rows[valid_rows] = shard_predictions
+            shard_predictions = all_rows
+        predictions.append(shard_predictions)
+        first_row += n_rows
+
+    return {
+        "predictions": np.concatenate(predictions) if predictions else np.array([]),
+        "version": _version,
+        "errors": errors or None,
+    }
+
+
+def run_batch_prediction(
+    *,
+    input_path: Path,
+    output_path: Path,
+    chunk_size: int = 50_000,
+    n_workers: int = 1,
+    pipeline: t.Optional[Pipeline] = None,
+) -> dict:
+    """Score a large input file chunk by chunk with bounded memory.
+    Each chunk is validated and scored with the saved pipeline, and its
+    predictions are written out in input order as they complete. With
+    n_workers > 1 chunks are scored in a process pool. Rows that fail
+    validation are skipped; the result lists them per chunk (invalid_rows,
+    numbered like the output's row column) with their errors.
+    """
+
+    writer = PredictionWriter(output_path)
+    rows, skipped_rows, errors = 0, 0, []
+    start = time.perf_counter()
+    try:
+        chunks = iter_input_chunks(input_path=input_path, chunk_size=chunk_size)
+        scored = _iter_scored_chunks(chunks, pipeline=pipeline, n_workers=n_workers)
+        for n_rows, valid_rows, predictions, chunk_errors in scored:
+            first_row = rows + skipped_rows
+            if chunk_errors:
+                invalid_rows = np.setdiff1d(np.arange(n_rows), valid_rows)
+                skipped_rows += len(invalid_rows)
+                errors.append({
+                    "first_row": first_row,
+                    "rows": len(invalid_rows),
+                    "invalid_rows": (first_row + invalid_rows).tolist(),
+                    "errors": chunk_errors,
+                })
+            if not len(valid_rows):
+                continue
+
+            writer.write(pd.DataFrame({"row": first_row + valid_rows, "prediction": predictions}))
+            rows += len(valid_rows)
+    finally:
+        writer.close()
+    seconds = time.perf_counter() - start
+
+    return {
+        "rows": rows,
+        "skipped_rows": skipped_rows,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds else 0.0,
+        "version": _version,
+        "errors": errors,
+    }
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file in chunks with the saved bikeshare pipeline.")
+    parser.add_argument("input_path", type=Path, help="input .csv or .parquet file")
+    parser.add_argument("output_path", type=Path, help="output .csv or .parquet file")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="rows per chunk (default: 50000)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes to score chunks in (default: 1)")
+    args = parser.parse_args(argv)
+
+    result = run_batch_prediction(
+        input_path=args.input_path, output_path=args.output_path, chunk_size=args.chunk_size, n_workers=args.workers
+    )
+
+    print(f"Scored {result['rows']} rows in {result['seconds']:.2f}s ({result['rows_per_sec']:.0f} rows/sec)")
+    if result["skipped_rows"]:
+        print(f"Skipped {result['skipped_rows']} rows that failed validation (in {len(result['errors'])} chunks)")
+
+
+if __name__ == "__main__":
+    main()
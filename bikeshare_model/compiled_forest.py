@@ -0,0 +1,122 @@
+import typing as t
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.pipeline import Pipeline
+
+# Rows traversed per block, to bound the (rows x trees) node index matrix
+BLOCK_ROWS = 4096
+
+
+class CompiledForest(BaseEstimator):
+    """
+    A fitted random forest flattened into contiguous NumPy node arrays.
+    All trees share one set of node arrays (feature, threshold, children,
+    missing-value direction), and the leaf values are stored in one block.
+    Leaves point to themselves, so a batch walks every tree at once for
+    max_depth steps. Predictions match the sklearn forest exactly.
+    """
+
+    def fit(self, X: t.Any, y: t.Any = None) -> "CompiledForest":
+        # refitting (e.g. a clone inside the profiler or tuning) needs the original forest
+        raise TypeError("CompiledForest cannot be fitted; fit the random forest and rebuild it with "
+                        "CompiledForest.from_forest().")
+
+    @classmethod
+    def from_forest(cls, forest: t.Union[RandomForestClassifier, RandomForestRegressor]) -> "CompiledForest":
+        """Flatten the trees of a fitted RandomForestClassifier/Regressor."""
+
+        if not isinstance(forest, (RandomForestClassifier, RandomForestRegressor)):
+            raise TypeError(f"Only fitted random forests can be compiled, got {type(forest).__name__}.")
+        if forest.n_outputs_ != 1:
+            raise ValueError("Only single-output forests can be compiled.")
+
+        features, thresholds, lefts, rights, missing_left, leaf_index, leaf_values, roots = [], [], [], [], [], [], [], []
+        node_offset, leaf_offset = 0, 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            nodes = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+
+            # leaves loop back to themselves so the traversal can run a fixed number of steps
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + node_offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + node_offset)
+            missing_left.append(np.asarray(tree.missing_go_to_left, dtype=bool))
+
+            tree_leaf_index = np.full(n_nodes, -1)
+            tree_leaf_index[is_leaf] = np.arange(is_leaf.sum()) + leaf_offset
+            leaf_index.append(tree_leaf_index)
+            leaf_values.append(tree.value[is_leaf, 0, :])
+
+            roots.append(node_offset)
+            node_offset += n_nodes
+            leaf_offset += int(is_leaf.sum())
+
+        compiled = cls()
+        compiled.feature_ = np.ascontiguousarray(np.concatenate(features), dtype=np.intp)
+        compiled.threshold_ = np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64)
+        compiled.children_left_ = np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp)
+        compiled.children_right_ = np.ascontiguousarray(np.concatenate(rights), dtype=np.intp)
+        compiled.missing_go_to_left_ = np.concatenate(missing_left)
+        compiled.leaf_index_ = np.ascontiguousarray(np.concatenate(leaf_index), dtype=np.intp)
+        compiled.leaf_values_ = np.ascontiguousarray(np.concatenate(leaf_values), dtype=np.float64)
+        compiled.roots_ = np.asarray(roots, dtype=np.intp)
+        compiled.max_depth_ = max(estimator.tree_.max_depth for estimator in forest.estimators_)
+        compiled.is_classifier_ = isinstance(forest, RandomForestClassifier)
+        compiled.classes_ = getattr(forest, "classes_", None)
+        compiled.feature_names_in_ = getattr(forest, "feature_names_in_", None)
+        compiled.n_features_in_ = forest.n_features_in_
+        return compiled
+
+    def _as_array(self, X: t.Any) -> np.ndarray:
+        # sklearn trees compare float32 inputs against float64 thresholds
+        if isinstance(X, pd.DataFrame) and self.feature_names_in_ is not None:
+            X = X[list(self.feature_names_in_)]
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def apply(self, X: t.Any) -> np.ndarray:
+        """Leaf row (into leaf_values_) reached by every row in every tree, shape (n_rows, n_trees)."""
+
+        X = self._as_array(X)
+        leaves = np.empty((len(X), len(self.roots_)), dtype=np.intp)
+        for start in range(0, len(X), BLOCK_ROWS):
+            block = X[start:start + BLOCK_ROWS]
+            rows = np.arange(len(block))[:, np.newaxis]
+            nodes = np.broadcast_to(self.roots_, (len(block), len(self.roots_)))
+            for _ in range(self.max_depth_):
+                values = block[rows, self.feature_[nodes]]
+                go_left = np.where(np.isnan(values), self.missing_go_to_left_[nodes], values <= self.threshold_[nodes])
+                nodes = np.where(go_left, self.children_left_[nodes], self.children_right_[nodes])
+            leaves[start:start + BLOCK_ROWS] = self.leaf_index_[nodes]
+        return leaves
+
+    def _accumulate(self, X: t.Any) -> np.ndarray:
+        # sum tree by tree, in the same order as sklearn, so floating point results are identical
+        leaves = self.apply(X)
+        total = np.zeros((len(leaves), self.leaf_values_.shape[1]), dtype=np.float64)
+        for tree in range(leaves.shape[1]):
+            total += self.leaf_values_[leaves[:, tree]]
+        total /= leaves.shape[1]
+        return total
+
+    def predict_proba(self, X: t.Any) -> np.ndarray:
+        if not self.is_classifier_:
+            raise AttributeError("predict_proba is only available for compiled classifiers.")
+        return self._accumulate(X)
+
+    def predict(self, X: t.Any) -> np.ndarray:
+        if self.is_classifier_:
+            return self.classes_.take(np.argmax(self._accumulate(X), axis=1), axis=0)
+        return self._accumulate(X)[:, 0]
+
+
+def compile_pipeline(pipeline: Pipeline) -> Pipeline:
+    """Return a copy of a fitted pipeline whose final forest is replaced by its CompiledForest."""
+
+    name, forest = pipeline.steps[-1]
+    return Pipeline(pipeline.steps[:-1] + [(name, CompiledForest.from_forest(forest))])
@@ -0,0 +1,225 @@
+import typing as t
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.pipeline import Pipeline
+
+from bikeshare_model.config.core import config
+from bikeshare_model.processing.features import (
+    CompactFeatures,
+    DropColumn,
+    Mapper,
+    OutlierHandler,
+    WeathersitImputer,
+    WeekdayImputer,
+    WeekdayOneHotEncoder,
+)
+
+# 1970-01-01 was a Thursday (pandas dayofweek 3)
+_EPOCH_DAYOFWEEK = 3
+
+
+class _Codes(t.NamedTuple):
+    """A non-numeric column as factorized codes (-1 = missing) into its unique values."""
+
+    codes: np.ndarray
+    uniques: np.ndarray
+
+
+def _as_codes(values: t.Union[np.ndarray, _Codes, pd.Series]) -> _Codes:
+    if isinstance(values, _Codes):
+        return values
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        return _Codes(values.cat.codes.to_numpy(dtype=np.intp, copy=True), np.asarray(values.cat.categories, dtype=object))
+    codes, uniques = pd.factorize(np.asarray(values))
+    return _Codes(codes.astype(np.intp, copy=False), np.asarray(uniques, dtype=object))
+
+
+def _code_of(codes: _Codes, values: t.Sequence[t.Any]) -> t.Tuple[_Codes, np.ndarray]:
+    """Codes of `values` among the uniques, appending the ones that are not there yet."""
+
+    uniques = pd.Index(codes.uniques)
+    positions = uniques.get_indexer(values)
+    new_values = [value for value, position in zip(values, positions) if position < 0]
+    if new_values:
+        uniques = uniques.append(pd.Index(new_values, dtype=object))
+        positions = uniques.get_indexer(values)
+    return _Codes(codes.codes, np.asarray(uniques, dtype=object)), positions
+
+
+def _dayofweek(dates: pd.Series, rows: np.ndarray) -> np.ndarray:
+    dates = dates.to_numpy()[rows]
+    if not np.issubdtype(dates.dtype, np.datetime64):
+        dates = pd.to_datetime(dates, format="%Y-%m-%d").to_numpy()
+    return (dates.astype("datetime64[D]").astype(np.int64) + _EPOCH_DAYOFWEEK) % 7
+
+
+class CompiledPreprocessor(BaseEstimator, TransformerMixin):
+    """
+    The fitted bikeshare preprocessing steps fused into one pass over the raw columns.
+    from_pipeline() replays the steps on the column layout once and keeps, for
+    every output column, the operations that produce it (imputation, ordinal
+    mapping, clipping, one-hot position). transform_array() then reads each
+    raw column once, applies its operations on NumPy arrays (non-numeric
+    columns as factorized codes) and writes the result straight into a float32
+    matrix in model column order. The values equal the pandas steps' output
+    cast to float32, which is what the forest predicts on.
+    """
+
+    def fit(self, X: t.Any, y: t.Any = None) -> "CompiledPreprocessor":
+        # refitting (e.g. a clone inside the profiler or feature cache) needs the original steps
+        raise TypeError("CompiledPreprocessor cannot be fitted; fit the preprocessing steps and rebuild it with "
+                        "CompiledPreprocessor.from_pipeline().")
+
+    def __sklearn_is_fitted__(self) -> bool:
+        return hasattr(self, "plan_")
+
+    @classmethod
+    def from_pipeline(
+        cls, pipeline: Pipeline, *, input_columns: t.Optional[t.Sequence[str]] = None
+    ) -> "CompiledPreprocessor":
+        """Compile the fitted preprocessing steps of a pipeline (a final model step is ignored)."""
+
+        steps = [step for _, step in pipeline.steps]
+        if steps and hasattr(steps[-1], "predict"):
+            model, steps = steps[-1], steps[:-1]
+        else:
+            model = None
+
+        # output column -> (source column, operations), in the current column order
+        layout: t.Dict[str, t.Tuple[str, t.List[tuple]]] = {
+            column: (column, []) for column in (input_columns or config.model_config_.features)
+        }
+        for step in steps:
+            if isinstance(step, WeekdayImputer):
+                layout[step.weekday_column][1].append(("impute_weekday", step.date_column))
+            elif isinstance(step, WeathersitImputer):
+                layout[step.column][1].append(("fill", step.most_frequent))
+            elif isinstance(step, Mapper):
+                for column, (keys, targets) in step.lookup_tables_.items():
+                    if column in layout:
+                        layout[column][1].append(("map", keys, targets))
+            elif isinstance(step, OutlierHandler):
+                for column, bounds in step.bounds.items():
+                    layout[column][1].append(("clip", bounds["lower"], bounds["upper"]))
+            elif isinstance(step, WeekdayOneHotEncoder):
+                source, operations = layout.pop(step.column)
+                for position, name in enumerate(step.feature_names_):
+                    layout[name] = (source, operations + [("one_hot", step.category_index_, position)])
+            elif isinstance(step, DropColumn):
+                layout.pop(step.column_name, None)
+            elif isinstance(step, CompactFeatures):
+                # the compiled output is already one float32 matrix
+                continue
+            else:
+                raise TypeError(f"Cannot compile preprocessing step {type(step).__name__}.")
+
+        columns = list(layout)
+        if model is not None and getattr(model, "feature_names_in_", None) is not None:
+            if sorted(model.feature_names_in_) != sorted(columns):
+                raise ValueError("The compiled columns do not match the features the model was fitted on.")
+            columns = list(model.feature_names_in_)
+
+        # group output columns by source and operations, so each source is evaluated once
+        plan: t.Dict[t.Tuple[str, int], dict] = {}
+        for index, column in enumerate(columns):
+            source, operations = layout[column]
+            if operations and operations[-1][0] == "one_hot":
+                _, category_index, position = operations[-1]
+                key = (source, id(category_index))
+                entry = plan.setdefault(key, {
+                    "source": source, "operations": operations[:-1], "categories": category_index,
+                    "outputs": np.full(len(category_index), -1, dtype=np.intp),
+                })
+                entry["outputs"][position] = index
+            else:
+                plan[(column, -1)] = {"source": source, "operations": operations, "categories": None, "output": index}
+
+        compiled = cls()
+        compiled.plan_ = list(plan.values())
+        compiled.feature_names_out_ = np.asarray(columns, dtype=object)
+        compiled.n_features_out_ = len(columns)
+        return compiled
+
+    def get_feature_names_out(self, input_features: t.Any = None) -> np.ndarray:
+        return self.feature_names_out_
+
+    @staticmethod
+    def _apply(X: pd.DataFrame, values: t.Any, operations: t.List[tuple]) -> t.Union[np.ndarray, _Codes]:
+        for operation in operations:
+            kind = operation[0]
+            if kind == "impute_weekday":
+                codes = _as_codes(values)
+                missing = np.flatnonzero(codes.codes < 0)
+                if len(missing):
+                    codes, day_codes = _code_of(codes, list(WeekdayImputer.day_abbreviations))
+                    codes.codes[missing] = day_codes[_dayofweek(X[operation[1]], missing)]
+                values = codes
+            elif kind == "fill":
+                if _is_numeric(values):
+                    values = np.asarray(values, dtype=float)
+                    values = np.where(np.isnan(values), operation[1], values)
+                else:
+                    codes = _as_codes(values)
+                    missing = codes.codes < 0
+                    if missing.any():
+                        codes, (fill_code,) = _code_of(codes, [operation[1]])
+                        codes.codes[missing] = fill_code
+                    values = codes
+            elif kind == "map":
+                _, keys, targets = operation
+                codes = _as_codes(values)
+                positions = np.append(keys.get_indexer(codes.uniques), -1)[codes.codes]
+                mapped = np.full(len(positions), np.nan)
+                found = positions >= 0
+                mapped[found] = targets[positions[found]]
+                values = mapped
+            elif kind == "clip":
+                values = np.clip(_as_numeric(values), operation[1], operation[2])
+        return values
+
+    def transform_array(self, X: pd.DataFrame, out: t.Optional[np.ndarray] = None) -> np.ndarray:
+        """The preprocessed features as a float32 matrix, written into `out` when given."""
+
+        if out is None:
+            out = np.empty((len(X), self.n_features_out_), dtype=np.float32)
+        elif out.shape != (len(X), self.n_features_out_):
+            raise ValueError(f"out must have shape {(len(X), self.n_features_out_)}, got {out.shape}.")
+
+        for entry in self.plan_:
+            values = self._apply(X, X[entry["source"]], entry["operations"])
+            if entry["categories"] is None:
+                out[:, entry["output"]] = _as_numeric(values)
+                continue
+
+            # one-hot block: a category position per row (-1 for unseen or missing values)
+            codes = _as_codes(values)
+            positions = np.append(entry["categories"].get_indexer(codes.uniques), -1)[codes.codes]
+            outputs = entry["outputs"]
+            out[:, outputs] = 0
+            rows = np.flatnonzero(positions >= 0)
+            out[rows, outputs[positions[rows]]] = 1
+        return out
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        """transform_array wrapped (without copying) in a frame with the model's column names."""
+        return pd.DataFrame(self.transform_array(X), index=X.index, columns=self.feature_names_out_, copy=False)
+
+
+def _is_numeric(values: t.Union[np.ndarray, _Codes, pd.Series]) -> bool:
+    return not isinstance(values, _Codes) and pd.api.types.is_numeric_dtype(values.dtype)
+
+
+def _as_numeric(values: t.Union[np.ndarray, _Codes, pd.Series]) -> np.ndarray:
+    if isinstance(values, _Codes):
+        numeric = np.append(np.asarray(values.uniques, dtype=float), np.nan)
+        return numeric[values.codes]
+    return np.asarray(values, dtype=float)
+
+
+def compile_preprocessing(pipeline: Pipeline) -> Pipeline:
+    """Return a copy of a fitted pipeline whose preprocessing steps are fused into one CompiledPreprocessor."""
+
+    name, model = pipeline.steps[-1]
+    return Pipeline([("compiled_preprocessing", CompiledPreprocessor.from_pipeline(pipeline)), (name, model)])
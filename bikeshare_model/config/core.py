@@ -1,18 +1,17 @@
 # Path setup, and access the config.yml file, datasets folder & trained models
-import sys
+import json
+import os
+import tempfile
+import zlib
 from pathlib import Path
-file = Path(__file__).resolve()
-parent, root = file.parent, file.parents[1]
-sys.path.append(str(root))
-
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List
 from pydantic import BaseModel
-from strictyaml import YAML, load
 
-import bikeshare_model
+if TYPE_CHECKING:
+    from strictyaml import YAML
 
 # Project Directories
-PACKAGE_ROOT = Path(bikeshare_model.__file__).resolve().parent
+PACKAGE_ROOT = Path(__file__).resolve().parents[1]
 #print(PACKAGE_ROOT)
 ROOT = PACKAGE_ROOT.parent
 CONFIG_FILE_PATH = PACKAGE_ROOT / "config.yml"
@@ -22,13 +21,42 @@ DATASET_DIR = PACKAGE_ROOT / "datasets"
 TRAINED_MODEL_DIR = PACKAGE_ROOT / "trained_models"
 
 
+def user_cache_dir() -> Path:
+    """
+    Directory for the package's caches: $BIKESHARE_MODEL_CACHE_DIR when set,
+    otherwise bikeshare_model in the user cache directory ($XDG_CACHE_HOME or
+    ~/.cache, %LOCALAPPDATA% on Windows), never inside an installed package.
+    """
+    override = os.environ.get("BIKESHARE_MODEL_CACHE_DIR")
+    if override:
+        return Path(override)
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "bikeshare_model"
+
+
+CACHE_DIR = user_cache_dir()
+FEATURE_CACHE_DIR = CACHE_DIR / "features"
+# validated config.yml, reused by later processes while config.yml and this module are unchanged
+# (one snapshot per installation, so checkouts sharing the cache directory do not overwrite each other's)
+CONFIG_SNAPSHOT_PATH = CACHE_DIR / f"config-{zlib.crc32(str(PACKAGE_ROOT).encode()):08x}.json"
+
+
 class AppConfig(BaseModel):
     """
     Application-level config.
     """
 
     training_data_file: str
+    dataset_format: str
+    pipeline_name: str
     pipeline_save_file: str
+    pipeline_compress_method: str
+    pipeline_compress_level: int
+    prediction_cache_size: int
+    prediction_cache_ttl_seconds: float
 
 
 class ModelConfig(BaseModel):
@@ -40,14 +68,26 @@ class ModelConfig(BaseModel):
     target: str
     features: List[str]
     numeric_cols: List[str] 
+    dtypes: Dict[str, str]
     weekday_col:str 
     dteday_col:str 
+    hr_col: str
   
     test_size:float
     random_state: int
+    model_type: str
     n_estimators: int
     max_depth: int
     max_features: int
+    n_jobs: int
+    warm_start_n_estimators: int
+    outlier_keep_sample: bool
+    compact_features: bool
+    search_method: str
+    search_space: Dict[str, List[int]]
+    search_n_candidates: int
+    cv_folds: int
+    halving_factor: int
 
 
 class Config(BaseModel):
@@ -64,9 +104,11 @@ def find_config_file() -> Path:
     raise Exception(f"Config not found at {CONFIG_FILE_PATH!r}")
 
 
-def fetch_config_from_yaml(cfg_path: Path = None) -> YAML:
+def fetch_config_from_yaml(cfg_path: Path = None) -> "YAML":
     """Parse YAML containing the package configuration."""
 
+    from strictyaml import load
+
     if not cfg_path:
         cfg_path = find_config_file()
 
@@ -77,7 +119,7 @@ def fetch_config_from_yaml(cfg_path: Path = None) -> YAML:
     raise OSError(f"Did not find config file at path: {cfg_path}")
 
 
-def create_and_validate_config(parsed_config: YAML = None) -> Config:
+def create_and_validate_config(parsed_config: "YAML" = None) -> Config:
     """Run validation on config values."""
     if parsed_config is None:
         parsed_config = fetch_config_from_yaml()
@@ -91,4 +133,43 @@ def create_and_validate_config(parsed_config: YAML = None) -> Config:
     return _config
 
 
-config = create_and_validate_config()
\ No newline at end of file
+def _config_stamp(cfg_path: Path) -> Dict[str, int]:
+    source, schema = cfg_path.stat(), Path(__file__).stat()
+    return {
+        "path": str(cfg_path.resolve()),
+        "mtime_ns": source.st_mtime_ns,
+        "size": source.st_size,
+        "schema_mtime_ns": schema.st_mtime_ns,
+    }
+
+
+def load_config(cfg_path: Path = None, snapshot_path: Path = CONFIG_SNAPSHOT_PATH) -> Config:
+    """Return the validated config, from a JSON snapshot when one matches config.yml.
+    Parsing config.yml with strictyaml is the slow part of importing the
+    package, so the validated result is written to snapshot_path and reused
+    until config.yml (or this module) changes. The snapshot is only a cache:
+    it is rebuilt when unreadable or stale, and skipped when not writable.
+    """
+
+    cfg_path = cfg_path or find_config_file()
+    stamp = _config_stamp(cfg_path)
+    try:
+        snapshot = json.loads(snapshot_path.read_text())
+        if snapshot["stamp"] == stamp:
+            return Config.model_validate(snapshot["config"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    _config = create_and_validate_config(fetch_config_from_yaml(cfg_path))
+    try:
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        # write and rename, so concurrent processes never read a partial snapshot
+        with tempfile.NamedTemporaryFile("w", dir=snapshot_path.parent, suffix=".tmp", delete=False) as scratch:
+            json.dump({"stamp": stamp, "config": _config.model_dump(mode="json")}, scratch)
+        os.replace(scratch.name, snapshot_path)
+    except OSError:
+        pass
+    return _config
+
+
+config = load_config()
\ No newline at end of file
@@ -1,31 +1,73 @@
-import sys
-from pathlib import Path
-file = Path(__file__).resolve()
-parent, root = file.parent, file.parents[1]
-sys.path.append(str(root))
-
+from typing import Optional
+from sklearn.base import BaseEstimator
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestClassifier, RandomForestRegressor
 
 from bikeshare_model.config.core import config
-from bikeshare_model.processing.features import WeekdayImputer, WeathersitImputer, Mapper, OutlierHandler, WeekdayOneHotEncoder, DropColumn
-
-bikeshare_pipe=Pipeline([
-    ('weekday_imputer', WeekdayImputer(
-        # weekday_column=config.model_config_.weekday_col
-        )),
-    ('weathersit_imputer', WeathersitImputer()),
-    ('mapper', Mapper()),
-    ('outlier_handler', OutlierHandler(
-        # columns=config.model_config_.numeric_cols
-        )),
-    ('weekday_encoder', WeekdayOneHotEncoder(column=config.model_config_.weekday_col)),
-    ('drop_column', DropColumn(column_name=config.model_config_.dteday_col)), #Drop the column here
-    #  ('model_rf', RandomForestClassifier(n_estimators=config.model_config_.n_estimators, 
-    #                                      max_depth=config.model_config_.max_depth, 
-    #                                      max_features=config.model_config_.max_features,
-    #                                      random_state=config.model_config_.random_state))
-    ('model_rf', RandomForestClassifier())
-          
-     ])
+from bikeshare_model.processing.features import WeekdayImputer, WeathersitImputer, Mapper, OutlierHandler, WeekdayOneHotEncoder, DropColumn, CompactFeatures
+
+MODEL_TYPES = ("random_forest_classifier", "random_forest_regressor", "hist_gradient_boosting_regressor")
+
+
+def build_model(*, model_type: Optional[str] = None) -> BaseEstimator:
+    """Create the final estimator chosen by model_type in config.yml,
+    with the configured hyperparameters applied.
+    """
+
+    model_config = config.model_config_
+    model_type = model_type or model_config.model_type
+
+    if model_type in ("random_forest_classifier", "random_forest_regressor"):
+        forest = RandomForestClassifier if model_type == "random_forest_classifier" else RandomForestRegressor
+        return forest(n_estimators=model_config.n_estimators,
+                      max_depth=model_config.max_depth,
+                      max_features=model_config.max_features,
+                      n_jobs=model_config.n_jobs,
+                      random_state=model_config.random_state)
+    if model_type == "hist_gradient_boosting_regressor":
+        # boosting iterations play the role of n_estimators; threads come from OpenMP rather than n_jobs
+        return HistGradientBoostingRegressor(max_iter=model_config.n_estimators,
+                                             max_depth=model_config.max_depth,
+                                             random_state=model_config.random_state)
+
+    raise ValueError(f"Unknown model_type '{model_type}', expected one of {MODEL_TYPES}.")
+
+
+def build_bikeshare_pipe(*, copy: bool = True, model_type: Optional[str] = None,
+                        compact: Optional[bool] = None) -> Pipeline:
+    """Assemble the bikeshare pipeline.
+    With copy=True only the first step copies the input frame; every later
+    step works in place on that copy, so the caller's frame is never changed.
+    With copy=False the caller's frame is transformed in place.
+    With compact=True (default: compact_features in config.yml) the mapped
+    ordinals are int8, clipping is done in float32 and the model gets one
+    C-contiguous float32 matrix instead of a float64/uint8 frame.
+    """
+
+    compact = config.model_config_.compact_features if compact is None else compact
+    compact_steps = [('compact_features', CompactFeatures(dtype='float32'))] if compact else []
+    return Pipeline([
+        ('weekday_imputer', WeekdayImputer(
+            # weekday_column=config.model_config_.weekday_col
+            copy=copy)),
+        ('weathersit_imputer', WeathersitImputer(copy=False)),
+        ('mapper', Mapper(copy=False, dtype='int8' if compact else None)),
+        ('outlier_handler', OutlierHandler(
+            # columns=config.model_config_.numeric_cols
+            copy=False, dtype='float32' if compact else 'float64',
+            keep_sample=config.model_config_.outlier_keep_sample)),
+        ('weekday_encoder', WeekdayOneHotEncoder(column=config.model_config_.weekday_col, copy=False)),
+        ('drop_column', DropColumn(column_name=config.model_config_.dteday_col, copy=False)), #Drop the column here
+        *compact_steps,
+        ('model_rf', build_model(model_type=model_type))
+    ])
+
+
+def __getattr__(name: str) -> Pipeline:
+    # bikeshare_pipe is built on first use rather than whenever the module is imported
+    if name == "bikeshare_pipe":
+        global bikeshare_pipe
+        bikeshare_pipe = build_bikeshare_pipe()
+        return bikeshare_pipe
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,44 +1,54 @@
-import sys
-from pathlib import Path
-file = Path(__file__).resolve()
-parent, root = file.parent, file.parents[1]
-sys.path.append(str(root))
-
-from typing import Union
+import time
+from typing import Optional, Union
 import pandas as pd
 import numpy as np
 
 from bikeshare_model import __version__ as _version
 from bikeshare_model.config.core import config
-from bikeshare_model.pipeline import bikeshare_pipe
-from bikeshare_model.processing.data_manager import load_pipeline
-from bikeshare_model.processing.data_manager import pre_pipeline_preparation
+from bikeshare_model.prediction_cache import PredictionCache, get_prediction_cache
+from bikeshare_model.processing.data_manager import get_pipeline
 from bikeshare_model.processing.validation import validate_inputs
+from bikeshare_model.profiling import PipelineProfiler
 
 
-pipeline_file_name = f"{config.app_config_.pipeline_save_file}{_version}.pkl"
-bikeshare_pipe= load_pipeline(file_name=pipeline_file_name)
-
+def make_prediction(
+    *, input_data: Union[pd.DataFrame, dict], timings: bool = False, profiler: Optional[PipelineProfiler] = None,
+    cache: Optional[PredictionCache] = None,
+) -> dict:
+    """Make a prediction using a saved model.
+    Invalid input short-circuits before the model is loaded or run. With
+    timings=True the result also holds per-stage wall times in seconds, and
+    a profiler records every pipeline step of the predict call. Rows found in
+    the prediction cache (the given one, or the one enabled in config.yml)
+    are not sent to the model.
+    """
 
-def make_prediction(*,input_data:Union[pd.DataFrame, dict]) -> dict:
-    """Make a prediction using a saved model """
+    stage_times = {}
+    start = time.perf_counter()
 
     validated_data, errors = validate_inputs(input_df=pd.DataFrame(input_data))
-    
-    #validated_data=validated_data.reindex(columns=['Pclass','Sex','Age','Fare', 'Embarked','FamilySize','Has_cabin','Title'])
     validated_data=validated_data.reindex(columns=config.model_config_.features)
-    print(validated_data)
-    results = {"predictions": None, "version": _version, "errors": errors}
-    
-    predictions = bikeshare_pipe.predict(validated_data)
+    stage_times["validation"] = time.perf_counter() - start
 
-    results = {"predictions": predictions,"version": _version, "errors": errors}
-    print(results)
+    results = {"predictions": None, "version": _version, "errors": errors}
     if not errors:
+        # the saved pipeline is loaded on first use and cached
+        start = time.perf_counter()
+        bikeshare_pipe = get_pipeline()
+        stage_times["load_pipeline"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cache = cache if cache is not None else get_prediction_cache()
+        if profiler is not None:
+            results["predictions"] = profiler.predict(bikeshare_pipe, validated_data)
+        elif cache is not None:
+            results["predictions"] = cache.predict(bikeshare_pipe, validated_data)
+        else:
+            results["predictions"] = bikeshare_pipe.predict(validated_data)
+        stage_times["predict"] = time.perf_counter() - start
 
-        predictions = bikeshare_pipe.predict(validated_data)
-        results = {"predictions": predictions,"version": _version, "errors": errors}
-        #print(results)
+    if timings:
+        results["timings"] = stage_times
 
     return results
 
@@ -60,5 +70,6 @@ if __name__ == "__main__":
     "registered": [135, 5],
     }
     
-    result = make_prediction(input_data=data_in)
+    result = make_prediction(input_data=data_in, timings=True)
+    print(result)
 
@@ -0,0 +1,124 @@
+import threading
+import time
+import typing as t
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+if t.TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
+
+from bikeshare_model import __version__ as _version
+from bikeshare_model.config.core import config
+
+
+def row_keys(X: pd.DataFrame) -> np.ndarray:
+    """A 64-bit hash per row of validated features, independent of the frame's index and dtypes.
+    Numeric columns are hashed as float64 and the rest as strings, so 49 and
+    49.0, or a categorical and an object column, give the same key.
+    """
+
+    canonical = {}
+    for column in X.columns:
+        values = X[column]
+        if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+            canonical[column] = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            canonical[column] = values.astype(str).to_numpy(dtype=object)
+    return pd.util.hash_pandas_object(pd.DataFrame(canonical), index=False).to_numpy()
+
+
+class PredictionCache:
+    """
+    Size-bounded LRU cache of predictions per feature row, with an optional TTL.
+    Rows are keyed by the package version and a canonical hash of the validated
+    feature row. predict() looks a batch up row by row and sends only the
+    misses to the pipeline, in one call. The cache remembers which pipeline
+    object it was filled from and empties itself when a different one (e.g. a
+    newly loaded pickle) is passed in.
+    """
+
+    def __init__(self, *, max_size: int = 100_000, ttl_seconds: t.Optional[float] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._entries: "OrderedDict[t.Tuple[str, int], t.Tuple[float, t.Any]]" = OrderedDict()
+        self._pipeline_ref: t.Optional[weakref.ref] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _check_pipeline(self, pipeline: "Pipeline") -> None:
+        if self._pipeline_ref is None or self._pipeline_ref() is not pipeline:
+            if self._entries:
+                self.stats["invalidations"] += 1
+            self._entries.clear()
+            self._pipeline_ref = weakref.ref(pipeline)
+
+    def _lookup(self, keys: t.Sequence[t.Tuple[str, int]], now: float) -> t.List[t.Any]:
+        values = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                self._entries.move_to_end(key)
+                values.append(entry[1])
+            else:
+                values.append(None)
+        return values
+
+    def predict(self, pipeline: "Pipeline", X: pd.DataFrame) -> np.ndarray:
+        """Predictions for every row of a validated feature frame, computing only the misses."""
+
+        keys = [(_version, int(key)) for key in row_keys(X)]
+        now = time.monotonic()
+        with self._lock:
+            self._check_pipeline(pipeline)
+            values = self._lookup(keys, now)
+
+        missing = [row for row, value in enumerate(values) if value is None]
+        # repeated rows within one batch are predicted once
+        first_row: t.Dict[t.Tuple[str, int], int] = {}
+        for row in missing:
+            first_row.setdefault(keys[row], row)
+
+        if first_row:
+            predicted = pipeline.predict(X.iloc[list(first_row.values())])
+            expires = None if self.ttl_seconds is None else now + self.ttl_seconds
+            computed = dict(zip(first_row, predicted))
+            for row in missing:
+                values[row] = computed[keys[row]]
+            with self._lock:
+                for key, value in computed.items():
+                    self._entries[key] = (expires, value)
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+
+        with self._lock:
+            self.stats["hits"] += len(keys) - len(missing)
+            self.stats["misses"] += len(missing)
+        return np.asarray(values)
+
+
+_default_cache: t.Optional[PredictionCache] = None
+
+
+def get_prediction_cache() -> t.Optional[PredictionCache]:
+    """The process-wide cache configured by prediction_cache_size in config.yml (None when 0)."""
+
+    global _default_cache
+    size = config.app_config_.prediction_cache_size
+    if not size:
+        return None
+    if _default_cache is None:
+        ttl = config.app_config_.prediction_cache_ttl_seconds
+        _default_cache = PredictionCache(max_size=size, ttl_seconds=ttl or None)
+    return _default_cache
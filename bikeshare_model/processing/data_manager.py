@@ -1,14 +1,18 @@
-import sys
-from pathlib import Path
-file = Path(__file__).resolve()
-parent, root = file.parent, file.parents[1]
-sys.path.append(str(root))
-
+import hashlib
+import json
+import os
 import re
-import joblib
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
 import pandas as pd
 import typing as t
-from sklearn.pipeline import Pipeline
+
+# joblib and sklearn are imported where models are saved or loaded, so the
+# data helpers (and predict) import without pulling them in
+if t.TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
 
 from bikeshare_model import __version__ as _version
 from bikeshare_model.config.core import DATASET_DIR, TRAINED_MODEL_DIR, config
@@ -16,54 +20,297 @@ from bikeshare_model.config.core import DATASET_DIR, TRAINED_MODEL_DIR, config
 
 ##  Pre-Pipeline Preparation
 
-# 1. Extracts the title (Mr, Ms, etc) from the name variable
-def extract_year_month(df):
-    year = df['dteday'].apply(lambda x: int(x.split('-')[0]))
-    month = df['dteday'].apply(lambda x: int(x.split('-')[1]))
-    return year, month
+def parse_dates(dates: pd.Series) -> pd.Series:
+    """Parse a date column into datetime64 in a single vectorized pass.
+    Columns that are already datetime64 are returned untouched, so a batch
+    is never parsed twice. Malformed dates become NaT (validate_inputs
+    reports them as dteday errors).
+    """
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates
+    return pd.to_datetime(dates, format="%Y-%m-%d", errors="coerce")
+
+
+# 1. Derives calendar fields (year, month, ...) from the date variable
+def extract_date_features(df: pd.DataFrame, *, fields: t.Sequence[str] = ("year", "month")) -> t.Dict[str, pd.Series]:
+    dates = parse_dates(df[config.model_config_.dteday_col])
+    return {field: getattr(dates.dt, field) for field in fields}
+
+def extract_year_month(df: pd.DataFrame) -> t.Tuple[pd.Series, pd.Series]:
+    date_features = extract_date_features(df, fields=("year", "month"))
+    return date_features["year"], date_features["month"]
+
+def row_timestamps(df: pd.DataFrame) -> pd.Series:
+    """The hour each row describes: the date column plus the hour of day from 'hr' ("6am", "12pm", ...)."""
+    hours = pd.to_datetime(df[config.model_config_.hr_col].astype(str), format="%I%p").dt.hour
+    return parse_dates(df[config.model_config_.dteday_col]) + pd.to_timedelta(hours, unit="h")
 
 def pre_pipeline_preparation(*, data_frame: pd.DataFrame) -> pd.DataFrame:
 
-    data_frame['year'] = extract_year_month(data_frame)[0]
-    data_frame['month'] = extract_year_month(data_frame)[1]
+    # keep the parsed dates so later steps can reuse them instead of re-parsing
+    dteday_col = config.model_config_.dteday_col
+    data_frame[dteday_col] = parse_dates(data_frame[dteday_col])
+    for field, values in extract_date_features(data_frame).items():
+        data_frame[field] = values
 
     return data_frame
 
-def load_raw_dataset(*, file_name: str) -> pd.DataFrame:
-    dataframe = pd.read_csv(Path(f"{DATASET_DIR}/{file_name}"))
-    return dataframe
+# Binary copies of the CSV, by dataset_format
+DATASET_SUFFIXES = {"parquet": ".parquet", "feather": ".feather", "pickle": ".pkl"}
+
+
+def dataset_dtypes(columns: t.Iterable[str]) -> t.Dict[str, t.Any]:
+    """The configured dtypes of the given columns. 'category' columns get a fixed
+    CategoricalDtype with the values the input schema allows, so every file (e.g.
+    a single day) has the same categories; other values are read as missing.
+    """
+    from bikeshare_model.processing.validation import schema_categories
+
+    categories = schema_categories()
+    dtypes = {}
+    for column in columns:
+        dtype = config.model_config_.dtypes.get(column)
+        if dtype == "category" and column in categories:
+            dtype = pd.CategoricalDtype(categories=categories[column])
+        if dtype is not None:
+            dtypes[column] = dtype
+    return dtypes
+
+
+def read_dataset(path: Path) -> pd.DataFrame:
+    """Read a CSV with the configured dtypes, or a binary copy written by convert_dataset."""
+
+    if path.suffix in (".parquet", ".feather", ".pkl"):
+        readers = {".parquet": pd.read_parquet, ".feather": pd.read_feather, ".pkl": pd.read_pickle}
+        dataframe = readers[path.suffix](path)
+        # copies written under an older dtype config (e.g. int16 counts) are brought up to date
+        stale = {column: dtype for column, dtype in dataset_dtypes(dataframe.columns).items()
+                 if dataframe[column].dtype != dtype}
+        return dataframe.astype(stale) if stale else dataframe
 
-def load_dataset(*, file_name: str) -> pd.DataFrame:
-    dataframe = pd.read_csv(Path(f"{DATASET_DIR}/{file_name}"))
+    return pd.read_csv(path, dtype=dataset_dtypes(pd.read_csv(path, nrows=0).columns))
+
+
+def convert_dataset(*, file_name: str, dataset_format: str) -> Path:
+    """Write a typed binary copy of a CSV dataset next to it and return its path."""
+
+    if dataset_format not in DATASET_SUFFIXES:
+        raise ValueError(f"Unknown dataset_format {dataset_format!r}, expected one of {sorted(DATASET_SUFFIXES)}.")
+
+    csv_path = DATASET_DIR / file_name
+    binary_path = csv_path.with_suffix(DATASET_SUFFIXES[dataset_format])
+    dataframe = read_dataset(csv_path)
+    if dataset_format == "parquet":
+        dataframe.to_parquet(binary_path, index=False)
+    elif dataset_format == "feather":
+        dataframe.to_feather(binary_path)
+    else:
+        dataframe.to_pickle(binary_path)
+    return binary_path
+
+
+def load_raw_dataset(*, file_name: str, dataset_format: t.Optional[str] = None) -> pd.DataFrame:
+    """Load a dataset with explicit dtypes.
+    With a binary dataset_format the CSV is converted on first use (and
+    again whenever the CSV is newer than its copy) and the copy is loaded.
+    """
+
+    dataset_format = dataset_format or config.app_config_.dataset_format
+    csv_path = DATASET_DIR / file_name
+    if dataset_format == "csv":
+        return read_dataset(csv_path)
+
+    binary_path = csv_path.with_suffix(DATASET_SUFFIXES.get(dataset_format, ""))
+    if not binary_path.is_file() or binary_path.stat().st_mtime_ns < csv_path.stat().st_mtime_ns:
+        binary_path = convert_dataset(file_name=file_name, dataset_format=dataset_format)
+    return read_dataset(binary_path)
+
+def load_dataset(*, file_name: str, dataset_format: t.Optional[str] = None) -> pd.DataFrame:
+    dataframe = load_raw_dataset(file_name=file_name, dataset_format=dataset_format)
     transformed = pre_pipeline_preparation(data_frame=dataframe)
     return transformed
 
 
-def save_pipeline(*, pipeline_to_persist: Pipeline) -> None:
+def pipeline_file_name() -> str:
+    """File name of the pipeline for the installed package version."""
+    return f"{config.app_config_.pipeline_save_file}{_version}.pkl"
+
+
+def manifest_file_name(pipeline_file: t.Optional[str] = None) -> str:
+    """File name of the manifest written next to a pipeline artifact."""
+    return Path(pipeline_file or pipeline_file_name()).with_suffix(".json").name
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 hex digest of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as artifact:
+        for block in iter(lambda: artifact.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomically(path: Path, write: t.Callable[[Path], t.Any]) -> None:
+    """Write a file through a temporary file in the same directory and rename it into place,
+    so readers (hot reload, memory-mapped workers) see the old file or the new one, never a partial one.
+    """
+    handle, scratch = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=path.suffix)
+    os.close(handle)
+    try:
+        write(Path(scratch))
+        os.replace(scratch, path)
+    except BaseException:
+        Path(scratch).unlink(missing_ok=True)
+        raise
+
+
+def _compression(compress: t.Optional[int], method: t.Optional[str]) -> t.Optional[t.Tuple[str, int]]:
+    level = config.app_config_.pipeline_compress_level if compress is None else compress
+    if not level:
+        return None
+    return (method or config.app_config_.pipeline_compress_method, int(level))
+
+
+def save_pipeline(
+    *, pipeline_to_persist: "Pipeline", compress: t.Optional[int] = None, compress_method: t.Optional[str] = None,
+    watermark: t.Optional[pd.Timestamp] = None,
+) -> None:
     """Persist the pipeline.
     Saves the versioned model, and overwrites any previous
     saved models. This ensures that when the package is
     published, there is only one trained model that can be
     called, and we know exactly how it was built.
+
+    compress is a joblib compression level (0 keeps the artifact uncompressed,
+    so it can be loaded with mmap_mode) and defaults to the configured level.
+    A JSON manifest with the version, features, size and checksum is written
+    next to the artifact, along with the watermark: the newest row timestamp
+    the pipeline was trained on, which incremental training starts after.
+    Both files are replaced atomically, and older artifacts are removed
+    only once the new one is in place.
     """
 
+    import joblib
+
     # Prepare versioned save file name
-    save_file_name = f"{config.app_config_.pipeline_save_file}{_version}.pkl"
+    save_file_name = pipeline_file_name()
     save_path = TRAINED_MODEL_DIR / save_file_name
+    compression = _compression(compress, compress_method)
 
-    remove_old_pipelines(files_to_keep=[save_file_name])
-    joblib.dump(pipeline_to_persist, save_path)
+    _write_atomically(save_path, lambda path: joblib.dump(pipeline_to_persist, path, compress=compression or 0))
+    write_manifest(pipeline=pipeline_to_persist, file_name=save_file_name, compression=compression, watermark=watermark)
+    remove_old_pipelines(files_to_keep=[save_file_name, manifest_file_name(save_file_name)])
     print("Model/pipeline trained successfully!")
 
 
-def load_pipeline(*, file_name: str) -> Pipeline:
-    """Load a persisted pipeline."""
+def write_manifest(
+    *, pipeline: "Pipeline", file_name: str, compression: t.Optional[t.Tuple[str, int]] = None,
+    watermark: t.Optional[pd.Timestamp] = None,
+) -> t.Dict[str, t.Any]:
+    """Describe a saved artifact in a JSON manifest next to it."""
+
+    import sklearn
+    from sklearn.pipeline import Pipeline
+
+    file_path = TRAINED_MODEL_DIR / file_name
+    manifest = {
+        "name": config.app_config_.pipeline_name,
+        "version": _version,
+        "file": Path(file_name).name,
+        "format": "joblib",
+        "compression": None if compression is None else {"method": compression[0], "level": compression[1]},
+        "mmap_compatible": compression is None,
+        "model": type(pipeline[-1]).__name__ if isinstance(pipeline, Pipeline) else type(pipeline).__name__,
+        "features": list(config.model_config_.features),
+        "watermark": None if watermark is None else pd.Timestamp(watermark).isoformat(),
+        "size_bytes": file_path.stat().st_size,
+        "sha256": file_sha256(file_path),
+        "sklearn_version": sklearn.__version__,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    manifest_path = file_path.with_name(manifest_file_name(file_name))
+    _write_atomically(manifest_path, lambda path: path.write_text(json.dumps(manifest, indent=2)))
+    return manifest
+
+
+def read_manifest(*, file_name: t.Optional[str] = None) -> t.Dict[str, t.Any]:
+    """Read the manifest of a saved pipeline artifact."""
+
+    file_path = TRAINED_MODEL_DIR / (file_name or pipeline_file_name())
+    manifest_path = file_path.with_name(manifest_file_name(file_path.name))
+    return json.loads(manifest_path.read_text())
+
+
+def load_pipeline(*, file_name: str, mmap_mode: t.Optional[str] = None, verify: bool = False) -> "Pipeline":
+    """Load a persisted pipeline.
+    With mmap_mode="r" the numpy arrays inside an uncompressed artifact are
+    memory-mapped from the file instead of read into private memory, so
+    workers on one host share those pages. With verify=True the file must
+    match the size and checksum recorded in its manifest.
+    """
+
+    import joblib
 
     file_path = TRAINED_MODEL_DIR / file_name
-    trained_model = joblib.load(filename=file_path)
+    if verify:
+        manifest = read_manifest(file_name=file_name)
+        if file_path.stat().st_size != manifest["size_bytes"] or file_sha256(file_path) != manifest["sha256"]:
+            raise ValueError(f"{file_path.name} does not match the checksum in its manifest.")
+    if mmap_mode is not None and _is_compressed(file_path):
+        # compressed artifacts cannot be memory-mapped; load them into memory
+        mmap_mode = None
+    trained_model = joblib.load(filename=file_path, mmap_mode=mmap_mode)
     return trained_model
 
 
+def _is_compressed(file_path: Path) -> bool:
+    with open(file_path, "rb") as artifact:
+        # uncompressed joblib files are plain pickles, which start with the PROTO opcode
+        return artifact.read(1) != b"\x80"
+
+
+# Loaded pipelines keyed by (file name, package version, file mtime)
+_pipeline_cache: t.Dict[t.Tuple[str, str, int], "Pipeline"] = {}
+_pipeline_cache_lock = threading.Lock()
+
+
+def get_pipeline(*, file_name: t.Optional[str] = None) -> "Pipeline":
+    """Return the persisted pipeline, loading it on first use.
+    The loaded pipeline is cached in-process per file name, package version
+    and file mtime, so a newly saved pickle is picked up on the next call.
+    """
+
+    file_name = file_name or pipeline_file_name()
+    key = (str(file_name), _version, (TRAINED_MODEL_DIR / file_name).stat().st_mtime_ns)
+
+    pipeline = _pipeline_cache.get(key)
+    if pipeline is not None:
+        return pipeline
+
+    with _pipeline_cache_lock:
+        if key not in _pipeline_cache:
+            # Drop stale entries for the same file before loading the new one
+            for stale_key in [cached for cached in _pipeline_cache if cached[0] == key[0]]:
+                del _pipeline_cache[stale_key]
+            _pipeline_cache[key] = load_pipeline(file_name=file_name)
+        return _pipeline_cache[key]
+
+
+def warm_up_pipeline(*, file_name: t.Optional[str] = None) -> "Pipeline":
+    """Load the pipeline ahead of the first request (e.g. at worker start-up)."""
+    return get_pipeline(file_name=file_name)
+
+
+def reload_pipeline(*, file_name: t.Optional[str] = None) -> "Pipeline":
+    """Drop the cached pipeline and load it again from disk."""
+
+    file_name = str(file_name or pipeline_file_name())
+    with _pipeline_cache_lock:
+        for cached in [cached for cached in _pipeline_cache if cached[0] == file_name]:
+            del _pipeline_cache[cached]
+    return get_pipeline(file_name=file_name)
+
+
 def remove_old_pipelines(*, files_to_keep: t.List[str]) -> None:
     """
     Remove old model pipelines.
@@ -0,0 +1,167 @@
+import hashlib
+import inspect
+import json
+import shutil
+import sys
+import tempfile
+import typing as t
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from bikeshare_model import __version__ as _version
+from bikeshare_model.config.core import DATASET_DIR, FEATURE_CACHE_DIR, config
+from bikeshare_model.processing import data_manager, validation
+from bikeshare_model.processing.data_manager import file_sha256, load_dataset, row_timestamps
+from bikeshare_model.profiling import PipelineProfiler
+
+# Bumped whenever the files of a cache entry change, so older entries are not read
+CACHE_FORMAT = 2
+
+
+class CachedFeatures(t.NamedTuple):
+    """Fitted preprocessing steps, the train/test split they produced and the newest row timestamp."""
+
+    preprocessing: Pipeline
+    X_train: pd.DataFrame
+    X_test: pd.DataFrame
+    y_train: np.ndarray
+    y_test: np.ndarray
+    watermark: pd.Timestamp
+
+
+# Code that turns the CSV into the frame the preprocessing steps are fitted on
+_PREPARATION_CODE = (
+    data_manager.parse_dates,
+    data_manager.extract_date_features,
+    data_manager.pre_pipeline_preparation,
+    data_manager.dataset_dtypes,
+    data_manager.read_dataset,
+    validation.schema_categories,
+    validation.DataInputSchema,
+)
+
+
+def _source(obj: t.Any) -> str:
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return getattr(obj, "__qualname__", repr(obj))
+
+
+def _step_fingerprint(step: t.Any) -> str:
+    # source of the transformer's whole module (so helpers it calls count too) as well as
+    # its parameters, so editing a transformer invalidates the cache
+    module = sys.modules.get(type(step).__module__)
+    source = _source(module if module is not None else type(step))
+    params = sorted((name, repr(value)) for name, value in step.get_params(deep=False).items())
+    return f"{type(step).__module__}.{type(step).__qualname__}\n{source}\n{params}"
+
+
+def feature_cache_key(*, file_name: str, preprocessing: Pipeline) -> str:
+    """Hash of the source data, feature and dtype config, split settings, data preparation code and preprocessing steps."""
+
+    model_config = config.model_config_
+    digest = hashlib.sha256()
+    for part in (
+        _version,
+        str(CACHE_FORMAT),
+        file_sha256(DATASET_DIR / file_name),
+        json.dumps([
+            model_config.features, model_config.dtypes, model_config.target,
+            model_config.test_size, model_config.random_state,
+        ]),
+        *(_source(code) for code in _PREPARATION_CODE),
+        *(f"{name}\n{_step_fingerprint(step)}" for name, step in preprocessing.steps),
+    ):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+
+def _build_features(
+    *, file_name: str, preprocessing: Pipeline, profiler: t.Optional[PipelineProfiler] = None,
+) -> CachedFeatures:
+    data = load_dataset(file_name=file_name)
+    X_train, X_test, y_train, y_test = train_test_split(
+        data[config.model_config_.features],
+        data[config.model_config_.target],
+        test_size=config.model_config_.test_size,
+        random_state=config.model_config_.random_state,
+    )
+    preprocessing = clone(preprocessing)
+    profiler = profiler or PipelineProfiler(enabled=False)
+    return CachedFeatures(
+        preprocessing=preprocessing,
+        X_train=profiler.fit_transform(preprocessing, X_train, y_train),
+        X_test=profiler.transform(preprocessing, X_test),
+        y_train=np.asarray(y_train),
+        y_test=np.asarray(y_test),
+        watermark=row_timestamps(data).max(),
+    )
+
+
+def _write_entry(entry_dir: Path, features: CachedFeatures) -> None:
+    # write into a scratch directory and rename it, so readers never see a partial entry
+    entry_dir.parent.mkdir(parents=True, exist_ok=True)
+    scratch_dir = Path(tempfile.mkdtemp(dir=entry_dir.parent, prefix=".tmp-"))
+    try:
+        joblib.dump(features.preprocessing, scratch_dir / "preprocessing.pkl")
+        for name in ("X_train", "X_test"):
+            np.save(scratch_dir / f"{name}.npy", getattr(features, name).to_numpy())
+        for name in ("y_train", "y_test"):
+            np.save(scratch_dir / f"{name}.npy", getattr(features, name))
+        (scratch_dir / "columns.json").write_text(json.dumps([str(column) for column in features.X_train.columns]))
+        (scratch_dir / "watermark.json").write_text(json.dumps(features.watermark.isoformat()))
+        scratch_dir.rename(entry_dir)
+    except OSError:
+        # another process stored the same entry first
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+        if not entry_dir.is_dir():
+            raise
+
+
+def _read_entry(entry_dir: Path, mmap_mode: t.Optional[str]) -> CachedFeatures:
+    columns = json.loads((entry_dir / "columns.json").read_text())
+    arrays = {
+        name: np.load(entry_dir / f"{name}.npy", mmap_mode=mmap_mode)
+        for name in ("X_train", "X_test", "y_train", "y_test")
+    }
+    return CachedFeatures(
+        preprocessing=joblib.load(entry_dir / "preprocessing.pkl"),
+        X_train=pd.DataFrame(arrays["X_train"], columns=columns, copy=False),
+        X_test=pd.DataFrame(arrays["X_test"], columns=columns, copy=False),
+        y_train=arrays["y_train"],
+        y_test=arrays["y_test"],
+        watermark=pd.Timestamp(json.loads((entry_dir / "watermark.json").read_text())),
+    )
+
+
+def load_features(
+    *, file_name: str, preprocessing: Pipeline, use_cache: bool = True, mmap_mode: t.Optional[str] = "r",
+    profiler: t.Optional[PipelineProfiler] = None,
+) -> CachedFeatures:
+    """Fit the preprocessing steps on the train split of a dataset and transform both splits.
+    The result is stored under FEATURE_CACHE_DIR and reused while the data,
+    feature config, split settings and preprocessing steps are unchanged.
+    Cached feature matrices are memory-mapped from .npy files by default.
+    A profiler records the preprocessing steps whenever they actually run.
+    """
+
+    if not use_cache:
+        return _build_features(file_name=file_name, preprocessing=preprocessing, profiler=profiler)
+
+    entry_dir = FEATURE_CACHE_DIR / feature_cache_key(file_name=file_name, preprocessing=preprocessing)
+    if not entry_dir.is_dir():
+        _write_entry(entry_dir, _build_features(file_name=file_name, preprocessing=preprocessing, profiler=profiler))
+    return _read_entry(entry_dir, mmap_mode)
+
+
+def clear_feature_cache() -> None:
+    """Remove every cached feature matrix."""
+    shutil.rmtree(FEATURE_CACHE_DIR, ignore_errors=True)
@@ -3,49 +3,96 @@ import sys
 import pandas as pd
 import numpy as np
 from sklearn.base import BaseEstimator, TransformerMixin
-from datetime import datetime
+
+def _with_categories(values, new_values):
+    """Add the categories a categorical column lacks before new_values are written into it."""
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return values
+    missing = pd.Index(pd.unique(np.asarray(new_values, dtype=object))).difference(values.cat.categories)
+    return values.cat.add_categories(missing) if len(missing) else values
 
 class WeekdayImputer(BaseEstimator, TransformerMixin):
-    def __init__(self, date_column='dteday', weekday_column='weekday'):
+    """ Impute missing values in 'weekday' column from the day of week of the date column """
+
+    # Abbreviated day names indexed by pandas dayofweek (Monday=0)
+    day_abbreviations = np.array(['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'], dtype=object)
+
+    def __init__(self, date_column='dteday', weekday_column='weekday', copy=True):
+        """
+        :param copy: If False, impute in place on the frame passed to transform.
+        """
         self.date_column = date_column
         self.weekday_column = weekday_column
+        self.copy = copy
 
     def fit(self, X, y=None):
         # No fitting necessary for this imputer
         return self
 
+    def __sklearn_is_fitted__(self):
+        # Stateless, so always usable (e.g. in a sliced pipeline)
+        return True
+
     def transform(self, X):
-        # Find the indices of NaN entries in the weekday column
-        nan_indices = X[X[self.weekday_column].isnull()].index
-        
-        # Extract day names from the date column for these indices
-        for idx in nan_indices:
-            date_str = X.at[idx, self.date_column]
-            date_object = datetime.strptime(date_str, '%Y-%m-%d')
-            day_name = date_object.strftime('%A')
-            
-            # Impute the missing value with the day name
-            X.at[idx, self.weekday_column] = day_name[:3]
+        X = X.copy() if self.copy else X
+        weekdays = X[self.weekday_column]
+        missing = weekdays.isnull()
+        if not missing.any():
+            return X
+
+        # Reuse the datetime64 column from pre_pipeline_preparation when available,
+        # otherwise parse only the rows that need imputing (selected by position,
+        # so duplicate index labels are fine)
+        rows = np.flatnonzero(missing.to_numpy())
+        dates = X[self.date_column].iloc[rows]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, format='%Y-%m-%d')
+
+        # Impute all missing values at once from the day of week codes
+        day_names = np.empty(len(X), dtype=object)
+        day_names[rows] = self.day_abbreviations[dates.dt.dayofweek.to_numpy()]
+        weekdays = _with_categories(weekdays, day_names[rows])
+        X[self.weekday_column] = weekdays.mask(missing.to_numpy(), day_names)
 
         # print("Columns after WeekdayImputer", X.columns)
-        
+
         return X
 
 class WeathersitImputer(BaseEstimator, TransformerMixin):
     """ Impute missing values in 'weathersit' column by replacing them with the most frequent category value """
 
-    def __init__(self, column='weathersit'):
+    def __init__(self, column='weathersit', copy=True):
+        """
+        :param copy: If False, impute in place on the frame passed to transform.
+        """
         self.column = column
+        self.copy = copy
         self.most_frequent = None
 
     def fit(self, X, y=None):
         # Determine the most frequent category in the specified column
-        self.most_frequent = X[self.column].mode()[0]
+        self.category_counts_ = {}
+        return self.partial_fit(X)
+
+    def partial_fit(self, X, y=None):
+        """
+        Add a chunk of rows to the running category counts and update the most frequent
+        category (ties go to the smallest value, as with Series.mode).
+        """
+        if getattr(self, 'category_counts_', None) is None:
+            self.category_counts_ = {}
+        for category, count in X[self.column].value_counts(sort=False).items():
+            if count:
+                self.category_counts_[category] = self.category_counts_.get(category, 0) + int(count)
+
+        counts = pd.Series(self.category_counts_, dtype='int64').sort_index()
+        self.most_frequent = counts.idxmax()
         return self
 
     def transform(self, X):
+        X = X.copy() if self.copy else X
         # Fill missing values with the most frequent category
-        X[self.column] = X[self.column].fillna(self.most_frequent)
+        X[self.column] = _with_categories(X[self.column], [self.most_frequent]).fillna(self.most_frequent)
         # print("Columns after WeathersitImputer", X.columns)
         return X
 
@@ -55,7 +102,11 @@ class Mapper(BaseEstimator, TransformerMixin):
     Treat column as Ordinal categorical variable, and assign values accordingly
     """
 
-    def __init__(self, variables=None, mappings=None):
+    def __init__(self, variables=None, mappings=None, copy=True, dtype=None):
+        """
+        :param dtype: dtype of the mapped values (e.g. 'int8' for compact features); by default
+            the NumPy type of the mapping values.
+        """
         # Default mappings
         default_mappings = {
             'yr': {2011: 0, 2012: 1},
@@ -74,17 +125,51 @@ class Mapper(BaseEstimator, TransformerMixin):
 
         self.variables = variables
         self.mappings = mappings if mappings is not None else default_mappings
+        self.copy = copy
+        self.dtype = dtype
 
     def fit(self, X, y=None):
-        # No fitting necessary, mappings are predefined
+        # Compile each mapping into a lookup table: the mapping keys as an Index
+        # and the mapped values as a NumPy array in the same order
+        self.lookup_tables_ = {}
+        for column in (self.variables or self.mappings.keys()):
+            mapping = self.mappings.get(column, {})
+            self.lookup_tables_[column] = (
+                pd.Index(list(mapping.keys())), np.asarray(list(mapping.values()), dtype=self.dtype)
+            )
         return self
 
+    def _lookup(self, column, values):
+        """Map a column by factorizing it once and indexing into the compiled table."""
+        keys, targets = self.lookup_tables_[column]
+
+        # Categorical columns already carry their codes and categories
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, uniques = pd.factorize(values)
+
+        # Position of each unique value in the table; the trailing -1 catches missing values (code -1)
+        positions = np.append(keys.get_indexer(uniques), -1)[codes]
+        found = positions >= 0
+        if found.all():
+            return pd.Series(targets[positions], index=values.index, name=values.name)
+
+        # Unmapped values become NaN, as with Series.map
+        mapped = np.full(len(positions), np.nan, dtype=np.result_type(targets.dtype, float))
+        mapped[found] = targets[positions[found]]
+        return pd.Series(mapped, index=values.index, name=values.name)
+
     def transform(self, X):
         # Apply mappings to the specified columns
-        X_transformed = X.copy()
+        X_transformed = X.copy() if self.copy else X
+        compiled = getattr(self, 'lookup_tables_', None)
         for column in (self.variables or self.mappings.keys()):
             if column in X_transformed.columns:
-                X_transformed[column] = X_transformed[column].map(self.mappings.get(column, {}))
+                if compiled is not None:
+                    X_transformed[column] = self._lookup(column, X_transformed[column])
+                else:
+                    X_transformed[column] = X_transformed[column].map(self.mappings.get(column, {}))
         return X_transformed
 
 class OutlierHandler(BaseEstimator, TransformerMixin):
@@ -93,7 +178,9 @@ class OutlierHandler(BaseEstimator, TransformerMixin):
         - to upper-bound, if the value is higher than upper-bound, or
         - to lower-bound, if the value is lower than lower-bound respectively.
     """
-    def __init__(self, columns=None, factor=1.5, upper_bound=None, lower_bound=None):
+    def __init__(self, columns=None, factor=1.5, upper_bound=None, lower_bound=None, copy=True,
+                 quantile_method='exact', reservoir_size=100_000, random_state=None, dtype='float64',
+                 keep_sample=False):
         """
         Initialize the handler with optional columns and a factor for IQR.
 
@@ -101,52 +188,125 @@ class OutlierHandler(BaseEstimator, TransformerMixin):
         :param factor: The factor to multiply with IQR to determine bounds. Default is 1.5.
         :param upper_bound: Optional fixed upper bound for all columns.
         :param lower_bound: Optional fixed lower bound for all columns.
+        :param copy: If False, clip the columns in place on the frame passed to transform.
+        :param quantile_method: 'exact' computes the quartiles over the whole frame in fit;
+            'reservoir' estimates them from a fixed-size uniform sample of the rows, which
+            is also what partial_fit uses to learn bounds chunk by chunk.
+        :param keep_sample: If True, an exact fit also keeps the reservoir sample, so
+            partial_fit can merge new rows into its bounds (incremental training).
+            Otherwise partial_fit leaves exactly fitted bounds unchanged.
+        :param reservoir_size: Number of rows kept in the reservoir sample.
+        :param random_state: Seed for the reservoir sampling.
+        :param dtype: Float dtype the clipped columns are written back as ('float32' for compact features).
         """
         self.columns = columns
         self.factor = factor
+        self.copy = copy
         self.bounds = {}
-        self.fixed_upper_bound = upper_bound
-        self.fixed_lower_bound = lower_bound
+        self.upper_bound = upper_bound
+        self.lower_bound = lower_bound
+        self.quantile_method = quantile_method
+        self.reservoir_size = reservoir_size
+        self.random_state = random_state
+        self.dtype = dtype
+        self.keep_sample = keep_sample
 
     def fit(self, X, y=None):
-        # Determine which columns to process
-        columns_to_process = self.columns if self.columns is not None else X.select_dtypes(include=[np.number]).columns
+        if self.quantile_method == 'reservoir':
+            self._reset_reservoir()
+            return self.partial_fit(X)
+        if self.quantile_method != 'exact':
+            raise ValueError(f"quantile_method must be 'exact' or 'reservoir', got '{self.quantile_method}'.")
 
-        # Calculate bounds for each column
-        for column in columns_to_process:
-            Q1 = X[column].quantile(0.25)
-            Q3 = X[column].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - self.factor * IQR
-            upper_bound = Q3 + self.factor * IQR
+        # Determine which columns to process
+        columns_to_process = self._columns_to_process(X)
 
-            # Use fixed bounds if provided
-            if self.fixed_lower_bound is not None:
-                lower_bound = self.fixed_lower_bound
-            if self.fixed_upper_bound is not None:
-                upper_bound = self.fixed_upper_bound
+        # Calculate the quartiles of every column in a single call
+        quartiles = X[columns_to_process].quantile([0.25, 0.75]).to_numpy(dtype=float)
+        self._set_bounds(columns_to_process, quartiles[0], quartiles[1])
 
-            self.bounds[column] = {'lower': lower_bound, 'upper': upper_bound}
+        # Keep a reservoir sample only when asked for, so partial_fit can merge later chunks into these bounds
+        self._reset_reservoir()
+        self.columns_ = columns_to_process
+        if self.keep_sample:
+            self._sample(X[columns_to_process].to_numpy(dtype=float))
+        else:
+            self.reservoir_ = None
 
         return self
 
-    def transform(self, X):
-        X_transformed = X.copy()
+    def partial_fit(self, X, y=None):
+        """
+        Update the bounds with another chunk of rows, for data that does not fit in memory.
+        Rows are kept in a reservoir sample (Algorithm R) and the bounds are recomputed
+        from the sample after every chunk.
+        """
+        if getattr(self, 'reservoir_', None) is None:
+            if self.bounds:
+                # fitted exactly without keep_sample: no sample to merge the rows into
+                return self
+            self._reset_reservoir()
+        if self.columns_ is None:
+            self.columns_ = self._columns_to_process(X)
+
+        self._sample(X[self.columns_].to_numpy(dtype=float))
+
+        quartiles = np.nanquantile(self.reservoir_, [0.25, 0.75], axis=0)
+        self._set_bounds(self.columns_, quartiles[0], quartiles[1])
+        return self
 
-        for column, bounds in self.bounds.items():
-            lower_bound = bounds['lower']
-            upper_bound = bounds['upper']
+    def _sample(self, chunk):
+        n_rows = len(chunk)
+
+        # Fill the reservoir first, then replace sampled slots with probability size / rows seen
+        n_fill = min(max(self.reservoir_size - self.n_seen_, 0), n_rows)
+        if n_fill:
+            self.reservoir_ = np.vstack([self.reservoir_, chunk[:n_fill]]) if len(self.reservoir_) else chunk[:n_fill].copy()
+        if n_fill < n_rows:
+            seen = self.n_seen_ + np.arange(n_fill, n_rows)
+            slots = self.rng_.integers(0, seen + 1)
+            keep = slots < self.reservoir_size
+            self.reservoir_[slots[keep]] = chunk[n_fill:][keep]
+        self.n_seen_ += n_rows
+
+    def _columns_to_process(self, X):
+        return list(self.columns if self.columns is not None else X.select_dtypes(include=[np.number]).columns)
+
+    def _reset_reservoir(self):
+        self.columns_ = None
+        self.reservoir_ = np.empty((0, 0))
+        self.n_seen_ = 0
+        self.rng_ = np.random.default_rng(self.random_state)
+
+    def _set_bounds(self, columns, Q1, Q3):
+        IQR = Q3 - Q1
+        lower_bounds = Q1 - self.factor * IQR
+        upper_bounds = Q3 + self.factor * IQR
+
+        # Use fixed bounds if provided
+        if self.lower_bound is not None:
+            lower_bounds[:] = self.lower_bound
+        if self.upper_bound is not None:
+            upper_bounds[:] = self.upper_bound
+
+        self.bounds = {
+            column: {'lower': lower, 'upper': upper}
+            for column, lower, upper in zip(columns, lower_bounds.tolist(), upper_bounds.tolist())
+        }
 
-            X_transformed[column] = np.where(
-                X_transformed[column] < lower_bound,
-                lower_bound,
-                X_transformed[column]
-            )
-            X_transformed[column] = np.where(
-                X_transformed[column] > upper_bound,
-                upper_bound,
-                X_transformed[column]
-            )
+    def transform(self, X):
+        X_transformed = X.copy() if self.copy else X
+        if not self.bounds:
+            return X_transformed
+
+        # Clip every bounded column at once as a single 2-D float block
+        columns = list(self.bounds)
+        lower_bounds = np.array([bounds['lower'] for bounds in self.bounds.values()], dtype=float)
+        upper_bounds = np.array([bounds['upper'] for bounds in self.bounds.values()], dtype=float)
+        # pipelines pickled before the dtype option clip in float64
+        block = X_transformed[columns].to_numpy(dtype=getattr(self, 'dtype', 'float64'))
+        np.clip(block, lower_bounds, upper_bounds, out=block)
+        X_transformed[columns] = block
 
         return X_transformed
 
@@ -155,13 +315,18 @@ class WeekdayOneHotEncoder(BaseEstimator, TransformerMixin):
     One-hot encode a weekday column.
     """
 
-    def __init__(self, column=None):
+    def __init__(self, column=None, copy=True, sparse_output=False):
         """
         Initialize the encoder with the column to be one-hot encoded.
 
         :param column: The name of the column containing weekday information.
+        :param copy: If False, drop the column in place and share the remaining columns' data.
+        :param sparse_output: If True, emit the one-hot columns as pandas sparse columns
+            backed by a scipy CSR matrix (use DataFrame.sparse.to_coo() to get it back).
         """
         self.column = column
+        self.copy = copy
+        self.sparse_output = sparse_output
         self.categories_ = None
 
     def fit(self, X, y=None):
@@ -171,40 +336,104 @@ class WeekdayOneHotEncoder(BaseEstimator, TransformerMixin):
         
         # Determine unique categories in the training data
         self.categories_ = X[self.column].astype(str).unique()
+        self._set_layout()
         
         return self
 
+    def partial_fit(self, X, y=None):
+        """
+        Append categories not seen so far. Existing categories keep their output
+        columns; new ones get columns at the end.
+        """
+        if self.categories_ is None:
+            return self.fit(X)
+        if self.column not in X.columns:
+            raise ValueError(f"Column '{self.column}' does not exist in the DataFrame.")
+
+        categories = pd.Index(X[self.column].astype(str).unique())
+        new_categories = categories[self.category_index_.get_indexer(categories) < 0]
+        if len(new_categories):
+            self.categories_ = np.concatenate([self.categories_, np.asarray(new_categories, dtype=object)])
+            self._set_layout()
+        return self
+
+    def _set_layout(self):
+        # Fix the output layout once: one column per category, in categories_ order
+        self.category_index_ = pd.Index(self.categories_)
+        self.feature_names_ = pd.Index([f"{self.column}_{category}" for category in self.categories_])
+
     def transform(self, X):
         # Check if the column exists
         if self.column not in X.columns:
             raise ValueError(f"Column '{self.column}' does not exist in the DataFrame.")
-        
-        # Convert the weekday column to one-hot encoded columns
-        X_transformed = X.copy()
-        
-        # Cast the column to a categorical type using only the categories seen in fit
-        X_transformed[self.column] = pd.Categorical(X_transformed[self.column], categories=self.categories_)
-        
-        # Perform the one-hot encoding
-        one_hot_encoded = pd.get_dummies(X_transformed[self.column], prefix=self.column)
 
-        # Drop the original column and concatenate the new one-hot encoded columns
-        X_transformed = X_transformed.drop(columns=[self.column])
-        X_transformed = pd.concat([X_transformed, one_hot_encoded], axis=1)
+        category_index = self.category_index_
 
-        return X_transformed
+        # Category code of each row; unseen and missing values get -1 and an all-zero row
+        codes = category_index.get_indexer(X[self.column])
+        rows = np.flatnonzero(codes >= 0)
+
+        # Write the ones straight into a fixed-width block
+        if self.sparse_output:
+            from scipy import sparse
+
+            encoded = sparse.csr_matrix(
+                (np.ones(len(rows), dtype=np.uint8), (rows, codes[rows])),
+                shape=(len(X), len(category_index)),
+            )
+            one_hot_encoded = pd.DataFrame.sparse.from_spmatrix(encoded, index=X.index, columns=self.feature_names_)
+        else:
+            encoded = np.zeros((len(X), len(category_index)), dtype=np.uint8)
+            encoded[rows, codes[rows]] = 1
+            one_hot_encoded = pd.DataFrame(encoded, index=X.index, columns=self.feature_names_, copy=False)
+
+        # Drop the original column and append the one-hot encoded columns
+        if self.copy:
+            return pd.concat([X.drop(columns=[self.column]), one_hot_encoded], axis=1)
+
+        del X[self.column]
+        return pd.concat([X, one_hot_encoded], axis=1, copy=False)
 
 class DropColumn(BaseEstimator, TransformerMixin):
-    def __init__(self, column_name):
+    def __init__(self, column_name, copy=True):
+        """
+        :param copy: If False, drop the column in place on the frame passed to transform.
+        """
         self.column_name = column_name
+        self.copy = copy
 
     def fit(self, X, y=None):
         return self
 
+    def __sklearn_is_fitted__(self):
+        return True
+
     def transform(self, X):
         # Drop the specified column
         if self.column_name in X.columns:
-            return X.drop(self.column_name, axis=1)
-        else:
-            return X
+            if self.copy:
+                return X.drop(self.column_name, axis=1)
+            X.drop(self.column_name, axis=1, inplace=True)
+        return X
     
+
+class CompactFeatures(BaseEstimator, TransformerMixin):
+    """
+    Pack the preprocessed columns into one C-contiguous matrix of a single dtype (float32 by default).
+    The result is a frame backed by that matrix, so to_numpy() and the forest
+    (which works on float32 internally) use it without another copy.
+    """
+
+    def __init__(self, dtype='float32'):
+        self.dtype = dtype
+
+    def fit(self, X, y=None):
+        return self
+
+    def __sklearn_is_fitted__(self):
+        return True
+
+    def transform(self, X):
+        # to_numpy() of a mixed-dtype frame is column-major; the forest wants rows contiguous
+        matrix = np.ascontiguousarray(X.to_numpy(dtype=self.dtype))
+        return pd.DataFrame(matrix, index=X.index, columns=X.columns, copy=False)
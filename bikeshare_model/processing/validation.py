@@ -1,10 +1,6 @@
-import sys
-from pathlib import Path
-file = Path(__file__).resolve()
-parent, root = file.parent, file.parents[1]
-sys.path.append(str(root))
-
-from typing import List, Optional, Tuple, Union
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union, get_args, get_origin
 
 import numpy as np
 import pandas as pd
@@ -14,39 +10,166 @@ from bikeshare_model.config.core import config
 from bikeshare_model.processing.data_manager import pre_pipeline_preparation
 
 
-def validate_inputs(*, input_df: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[dict]]:
-    """Check model inputs for unprocessable values."""
+def validate_inputs(*, input_df: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[str]]:
+    """Check model inputs for unprocessable values.
+    Single records are validated with pydantic; larger batches use the
+    columnar checks in find_invalid_rows, which report errors in the same
+    JSON layout (loc = ["inputs", row, column]).
+    """
 
+    dteday_col = config.model_config_.dteday_col
+    raw_dates = input_df[dteday_col] if dteday_col in input_df.columns else None
     pre_processed = pre_pipeline_preparation(data_frame=input_df)
     # print(pre_processed.head())
-    validated_data = pre_processed[config.model_config_.features].copy()
+    validated_data = pre_processed[config.model_config_.features]
+    unparsed_dates = _unparsed_dates(raw_dates, validated_data.get(dteday_col))
+    has_unparsed_dates = unparsed_dates is not None and unparsed_dates.any()
     errors = None
 
-    try:
-        # replace numpy nans so that pydantic can validate
-        MultipleDataInputs(
-            inputs=validated_data.replace({np.nan: None}).to_dict(orient="records")
-        )
-    except ValidationError as error:
-        errors = error.json()
+    if len(validated_data) == 1:
+        try:
+            # replace numpy nans so that pydantic can validate
+            MultipleDataInputs(
+                inputs=validated_data.replace({np.nan: None}).to_dict(orient="records")
+            )
+        except ValidationError as error:
+            errors = error.json()
+        # the schema accepts any string as a date, so unparsable ones are added here
+        if has_unparsed_dates:
+            date_errors = {dteday_col: (np.flatnonzero(unparsed_dates), "datetime_from_date_parsing")}
+            date_errors_json = _errors_to_json(_with_raw_dates(validated_data, raw_dates), date_errors)
+            errors = json.dumps(json.loads(errors or "[]") + json.loads(date_errors_json))
+    else:
+        invalid_rows = find_invalid_rows(input_df=validated_data, unparsed_dates=unparsed_dates)
+        if invalid_rows:
+            errors = _errors_to_json(
+                _with_raw_dates(validated_data, raw_dates) if has_unparsed_dates else validated_data, invalid_rows
+            )
 
     return validated_data, errors
 
 
+def _unparsed_dates(raw_dates: Optional[pd.Series], parsed_dates: Optional[pd.Series]) -> Optional[np.ndarray]:
+    """Rows with a date that was present but could not be parsed (NaT after pre_pipeline_preparation)."""
+    if raw_dates is None or parsed_dates is None or raw_dates is parsed_dates:
+        return None
+    return raw_dates.notna().to_numpy() & parsed_dates.isna().to_numpy()
+
+
+def _with_raw_dates(validated_data: pd.DataFrame, raw_dates: pd.Series) -> pd.DataFrame:
+    """The inputs with the date column as given, so errors quote the raw date rather than NaT."""
+    return validated_data.assign(**{config.model_config_.dteday_col: raw_dates})
+
+
+def find_invalid_rows(
+    *, input_df: pd.DataFrame, unparsed_dates: Optional[np.ndarray] = None
+) -> Dict[str, Tuple[np.ndarray, str]]:
+    """Run the DataInputSchema checks column by column with vectorized masks.
+    unparsed_dates marks the rows whose date pre_pipeline_preparation could
+    not parse; they are reported as date column errors.
+    Returns {column: (positions of invalid rows, error type)} for every
+    column with at least one invalid row.
+    """
+
+    invalid_rows = {}
+    for column, (types, allowed) in _COLUMN_CHECKS.items():
+        if column not in input_df.columns:
+            continue
+        invalid, error_type = _invalid_mask(input_df[column], types, allowed)
+        if invalid.any():
+            invalid_rows[column] = (np.flatnonzero(invalid), error_type)
+    if unparsed_dates is not None and unparsed_dates.any():
+        invalid_rows[config.model_config_.dteday_col] = (np.flatnonzero(unparsed_dates), "datetime_from_date_parsing")
+    return invalid_rows
+
+
+def _invalid_mask(values: pd.Series, types: Tuple[type, ...], allowed: Optional[Tuple[Any, ...]]) -> Tuple[np.ndarray, str]:
+    present = values.notna().to_numpy()
+
+    if allowed is not None:
+        return present & ~values.isin(allowed).to_numpy(), "literal_error"
+
+    if datetime in types and pd.api.types.is_datetime64_any_dtype(values):
+        return np.zeros(len(values), dtype=bool), "datetime_type"
+
+    if str in types:
+        if pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty"):
+            return np.zeros(len(values), dtype=bool), "string_type"
+        is_str = np.fromiter((isinstance(value, str) for value in values), dtype=bool, count=len(values))
+        return present & ~is_str, "string_type"
+
+    numbers = pd.to_numeric(values, errors="coerce")
+    parsed = numbers.notna().to_numpy()
+    invalid = present & ~parsed
+    if int in types and float not in types:
+        invalid |= parsed & (np.mod(numbers.to_numpy(dtype=float, na_value=0.0), 1) != 0)
+        return invalid, "int_parsing"
+    return invalid, "float_parsing"
+
+
+_ERROR_MESSAGES = {
+    "datetime_type": "Input should be a valid datetime",
+    "datetime_from_date_parsing": "Input should be a valid date in the format YYYY-MM-DD",
+    "string_type": "Input should be a valid string",
+    "float_parsing": "Input should be a valid number",
+    "int_parsing": "Input should be a valid integer",
+}
+
+
+def _errors_to_json(input_df: pd.DataFrame, invalid_rows: Dict[str, Tuple[np.ndarray, str]]) -> str:
+    errors = []
+    for column, (rows, error_type) in invalid_rows.items():
+        allowed = _COLUMN_CHECKS[column][1]
+        message = f"Input should be {', '.join(repr(value) for value in allowed)}" if allowed else _ERROR_MESSAGES[error_type]
+        values = input_df[column].to_numpy()
+        for row in rows.tolist():
+            errors.append({"type": error_type, "loc": ["inputs", row, column], "msg": message, "input": values[row]})
+    return json.dumps(errors, default=str)
+
+
 class DataInputSchema(BaseModel):
-    dteday: Optional[str]
-    season: Optional[str]
-    hr: Optional[str]
-    holiday: Optional[str]
-    weekday: Optional[str]
-    workingday  : Optional[str]
-    weathersit  : Optional[str]
+    dteday: Optional[Union[datetime, str]]
+    season: Optional[Literal["spring", "summer", "fall", "winter"]]
+    hr: Optional[Literal[
+        "12am", "1am", "2am", "3am", "4am", "5am", "6am", "7am", "8am", "9am", "10am", "11am",
+        "12pm", "1pm", "2pm", "3pm", "4pm", "5pm", "6pm", "7pm", "8pm", "9pm", "10pm", "11pm",
+    ]]
+    holiday: Optional[Literal["No", "Yes"]]
+    weekday: Optional[Literal["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]]
+    workingday  : Optional[Literal["No", "Yes"]]
+    weathersit  : Optional[Literal["Clear", "Mist", "Light Rain", "Heavy Rain"]]
     temp        : Optional[float]
     atemp       : Optional[float]
     hum             : Optional[float]
     windspeed   : Optional[float]
-    casual         : Optional[int]  
+    casual         : Optional[int]
     registered  : Optional[int]
 
 class MultipleDataInputs(BaseModel):
     inputs: List[DataInputSchema]
+
+
+def _column_checks(schema: type) -> Dict[str, Tuple[Tuple[type, ...], Optional[Tuple[Any, ...]]]]:
+    """Derive (accepted types, allowed values) per column from the pydantic schema."""
+
+    checks = {}
+    for name, field in schema.model_fields.items():
+        types, allowed = [], None
+        for arg in get_args(field.annotation) or (field.annotation,):
+            if get_origin(arg) is Literal:
+                allowed = get_args(arg)
+            elif get_origin(arg) is Union:
+                types.extend(get_args(arg))
+            elif arg is not type(None):
+                types.append(arg)
+        checks[name] = (tuple(types), allowed)
+    return checks
+
+
+# Columnar checks, derived once from the same schema the pydantic path uses
+_COLUMN_CHECKS = _column_checks(DataInputSchema)
+
+
+def schema_categories() -> Dict[str, List[str]]:
+    """The allowed values of every Literal column in DataInputSchema."""
+    return {column: list(allowed) for column, (_, allowed) in _COLUMN_CHECKS.items() if allowed is not None}
@@ -0,0 +1,141 @@
+import contextlib
+import time
+import tracemalloc
+import typing as t
+
+if t.TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
+
+
+class PipelineProfiler:
+    """
+    Per-step wall time, rows and (optionally) memory of a pipeline.
+    The profiler runs the steps of the pipeline it is given one by one, the
+    same way Pipeline.fit/transform/predict do, and records one entry per
+    step call: {"step", "method", "rows", "seconds"} plus "allocated_bytes"
+    (memory still held after the call) and "peak_bytes" with
+    trace_memory=True. A disabled profiler calls the pipeline directly and
+    records nothing.
+    """
+
+    def __init__(
+        self, *, enabled: bool = True, trace_memory: bool = False,
+        callback: t.Optional[t.Callable[[dict], None]] = None,
+    ) -> None:
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.callback = callback
+        self.records: t.List[dict] = []
+
+    @contextlib.contextmanager
+    def record(self, step: str, method: str, X: t.Any = None) -> t.Iterator[None]:
+        """Record one call of `method` on `step`, run inside the with block."""
+
+        if not self.enabled:
+            yield
+            return
+
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = {
+                "step": step,
+                "method": method,
+                "rows": len(X) if hasattr(X, "__len__") else None,
+                "seconds": time.perf_counter() - start,
+            }
+            if self.trace_memory:
+                memory_after, peak = tracemalloc.get_traced_memory()
+                entry["allocated_bytes"] = memory_after - memory_before
+                entry["peak_bytes"] = peak - memory_before
+                if started_tracing:
+                    tracemalloc.stop()
+            self.records.append(entry)
+            if self.callback is not None:
+                self.callback(entry)
+
+    def _transform_steps(self, pipeline: "Pipeline", X: t.Any, *, method: str, y: t.Any = None) -> t.Any:
+        for name, step in pipeline.steps[:-1]:
+            if step is None or step == "passthrough":
+                continue
+            with self.record(name, method, X):
+                X = step.fit_transform(X, y) if method == "fit_transform" else step.transform(X)
+        return X
+
+    def fit(self, pipeline: "Pipeline", X: t.Any, y: t.Any = None) -> "Pipeline":
+        """Fit the pipeline, recording fit_transform of each transformer and fit of the final step."""
+
+        if not self.enabled:
+            return pipeline.fit(X, y)
+        Xt = self._transform_steps(pipeline, X, method="fit_transform", y=y)
+        name, estimator = pipeline.steps[-1]
+        with self.record(name, "fit", Xt):
+            estimator.fit(Xt, y)
+        return pipeline
+
+    def fit_transform(self, pipeline: "Pipeline", X: t.Any, y: t.Any = None) -> t.Any:
+        """Fit every step of an all-transformer pipeline and return the transformed data."""
+
+        if not self.enabled:
+            return pipeline.fit_transform(X, y)
+        Xt = self._transform_steps(pipeline, X, method="fit_transform", y=y)
+        name, transformer = pipeline.steps[-1]
+        with self.record(name, "fit_transform", Xt):
+            return transformer.fit_transform(Xt, y)
+
+    def transform(self, pipeline: "Pipeline", X: t.Any) -> t.Any:
+        if not self.enabled:
+            return pipeline.transform(X)
+        Xt = self._transform_steps(pipeline, X, method="transform")
+        name, transformer = pipeline.steps[-1]
+        with self.record(name, "transform", Xt):
+            return transformer.transform(Xt)
+
+    def predict(self, pipeline: "Pipeline", X: t.Any) -> t.Any:
+        if not self.enabled:
+            return pipeline.predict(X)
+        Xt = self._transform_steps(pipeline, X, method="transform")
+        name, estimator = pipeline.steps[-1]
+        with self.record(name, "predict", Xt):
+            return estimator.predict(Xt)
+
+    def summary(self) -> t.Dict[str, t.Dict[str, dict]]:
+        """Totals per method and step: calls, rows, seconds and, when traced, memory."""
+
+        summary: t.Dict[str, t.Dict[str, dict]] = {}
+        for entry in self.records:
+            totals = summary.setdefault(entry["method"], {}).setdefault(
+                entry["step"], {"calls": 0, "rows": 0, "seconds": 0.0}
+            )
+            totals["calls"] += 1
+            totals["rows"] += entry["rows"] or 0
+            totals["seconds"] += entry["seconds"]
+            if "peak_bytes" in entry:
+                totals["allocated_bytes"] = totals.get("allocated_bytes", 0) + entry["allocated_bytes"]
+                totals["peak_bytes"] = max(totals.get("peak_bytes", 0), entry["peak_bytes"])
+        return summary
+
+    def report(self) -> str:
+        """The summary as a plain-text table."""
+
+        lines = [f"{'method':<15}{'step':<22}{'calls':>6}{'rows':>10}{'ms':>10}{'alloc MB':>10}{'peak MB':>10}"]
+        for method, steps in self.summary().items():
+            for step, totals in steps.items():
+                memory = "".join(
+                    f"{totals[field] / 1e6:>10.1f}" if field in totals else f"{'-':>10}"
+                    for field in ("allocated_bytes", "peak_bytes")
+                )
+                lines.append(f"{method:<15}{step:<22}{totals['calls']:>6}{totals['rows']:>10}"
+                             f"{totals['seconds'] * 1000:>10.2f}{memory}")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        self.records.clear()
@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import json
+import typing as t
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+from bikeshare_model import __version__ as _version
+from bikeshare_model.config.core import config
+from bikeshare_model.prediction_cache import PredictionCache, get_prediction_cache
+from bikeshare_model.processing.data_manager import get_pipeline
+from bikeshare_model.processing.validation import validate_inputs
+
+
+def score_records(
+    records: t.List[dict], pipeline: Pipeline, cache: t.Optional[PredictionCache] = None,
+) -> t.List[dict]:
+    """Validate and score a list of single records with one pipeline.predict call.
+    Records that fail validation get their own errors and no prediction. With
+    a cache, only the rows it has not seen are sent to the pipeline.
+    """
+
+    validated_data, errors = validate_inputs(input_df=pd.DataFrame.from_records(records))
+
+    row_errors: t.Dict[int, list] = defaultdict(list)
+    for error in json.loads(errors) if errors else []:
+        row_errors[error["loc"][1]].append(error)
+
+    valid_rows = [row for row in range(len(records)) if row not in row_errors]
+    valid_data = validated_data.iloc[valid_rows].reindex(columns=config.model_config_.features)
+    if not valid_rows:
+        predictions = iter([])
+    elif cache is not None:
+        predictions = iter(cache.predict(pipeline, valid_data))
+    else:
+        predictions = iter(pipeline.predict(valid_data))
+
+    return [
+        {"prediction": None, "version": _version, "errors": json.dumps(row_errors[row])}
+        if row in row_errors else
+        {"prediction": next(predictions).item(), "version": _version, "errors": None}
+        for row in range(len(records))
+    ]
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-record requests into micro-batches.
+    Requests are queued and flushed as one batch once max_batch_size records
+    are waiting or max_wait_ms has passed since the first one arrived. Each
+    batch runs one pipeline.predict in a worker thread, and the results are
+    handed back to the individual callers. An optional PredictionCache
+    answers repeated records without running the pipeline.
+    """
+
+    def __init__(
+        self, *, max_batch_size: int = 64, max_wait_ms: float = 5.0, pipeline: t.Optional[Pipeline] = None,
+        cache: t.Optional[PredictionCache] = None,
+    ):
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.pipeline = pipeline
+        self.cache = cache
+        self.stats = {"requests": 0, "batches": 0}
+        self._queue: t.Optional[asyncio.Queue] = None
+        self._worker: t.Optional[asyncio.Task] = None
+        self._in_flight: list = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bikeshare-predict")
+
+    async def __aenter__(self) -> "MicroBatcher":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: t.Any) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+            self._fail_pending(RuntimeError("the prediction server is shutting down"))
+        self._executor.shutdown(wait=False)
+
+    def _fail_pending(self, error: Exception) -> None:
+        """Fail the requests the cancelled worker left behind, so their callers do not wait forever."""
+        pending = [future for _, future in self._in_flight]
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait()[1])
+        self._in_flight = []
+        for future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    async def predict(self, record: dict) -> dict:
+        """Queue one record and wait for its result."""
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    async def _next_batch(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = self._in_flight = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+
+            records = [record for record, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self._predict_batch, records)
+            except Exception as error:
+                results = [error] * len(batch)
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+            self._in_flight = []
+
+    def _predict_batch(self, records: t.List[dict]) -> t.List[t.Union[dict, Exception]]:
+        pipeline = self.pipeline if self.pipeline is not None else get_pipeline()
+        try:
+            return score_records(records, pipeline, self.cache)
+        except Exception:
+            if len(records) == 1:
+                raise
+
+        # Something in the batch broke scoring; score records one by one so only the culprit fails
+        results: t.List[t.Union[dict, Exception]] = []
+        for record in records:
+            try:
+                results.extend(score_records([record], pipeline, self.cache))
+            except Exception as error:
+                results.append(error)
+        return results
+
+
+async def _route(method: str, path: str, body: bytes, batcher: MicroBatcher) -> t.Tuple[str, dict]:
+    if method == "GET" and path == "/health":
+        health = {"status": "ok", "version": _version, **batcher.stats}
+        if batcher.cache is not None:
+            health["cache"] = {"size": len(batcher.cache), **batcher.cache.stats}
+        return "200 OK", health
+    if method != "POST" or path != "/predict":
+        return "404 Not Found", {"error": f"{method} {path} not found"}
+
+    try:
+        record = json.loads(body)
+    except ValueError as error:
+        return "400 Bad Request", {"error": f"invalid JSON: {error}"}
+    if not isinstance(record, dict):
+        return "400 Bad Request", {"error": "expected a JSON object with one record"}
+
+    try:
+        return "200 OK", await batcher.predict(record)
+    except Exception as error:
+        return "500 Internal Server Error", {"error": str(error)}
+
+
+async def _handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, batcher: MicroBatcher) -> None:
+    """Serve HTTP/1.1 requests on one connection, keeping it alive between requests."""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+            status, payload = await _route(method, path, body, batcher)
+            data = json.dumps(payload).encode()
+            keep_alive = headers.get("connection", "").lower() != "close"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(
+    *, host: str = "127.0.0.1", port: int = 8001, batcher: t.Optional[MicroBatcher] = None
+) -> t.Tuple[asyncio.AbstractServer, MicroBatcher]:
+    """Start the HTTP server (POST /predict, GET /health) on the running loop."""
+
+    batcher = batcher or MicroBatcher()
+    await batcher.start()
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(reader, writer, batcher), host=host, port=port
+    )
+    return server, batcher
+
+
+async def serve(*, host: str, port: int, max_batch_size: int, max_wait_ms: float) -> None:
+    batcher = MicroBatcher(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, cache=get_prediction_cache())
+    # load the model before accepting traffic
+    await asyncio.get_running_loop().run_in_executor(None, get_pipeline)
+    server, batcher = await start_server(host=host, port=port, batcher=batcher)
+    print(f"Serving bikeshare_model {_version} on http://{host}:{server.sockets[0].getsockname()[1]}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.close()
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve bikeshare predictions over HTTP with micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    asyncio.run(serve(host=args.host, port=args.port, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms))
+
+
+if __name__ == "__main__":
+    main()
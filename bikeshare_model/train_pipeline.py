@@ -1,50 +1,190 @@
-import sys
-from pathlib import Path
-file = Path(__file__).resolve()
-parent, root = file.parent, file.parents[1]
-sys.path.append(str(root))
-
+import argparse
+import typing as t
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
+from sklearn.base import BaseEstimator
+from sklearn.pipeline import Pipeline
 from sklearn.metrics import accuracy_score
 from sklearn.metrics import mean_squared_error, r2_score
 
 from bikeshare_model.config.core import config
-from bikeshare_model.pipeline import bikeshare_pipe
-from bikeshare_model.processing.data_manager import load_dataset, save_pipeline
+from bikeshare_model.pipeline import build_bikeshare_pipe
+from bikeshare_model.processing.data_manager import (
+    load_dataset,
+    load_pipeline,
+    pipeline_file_name,
+    read_manifest,
+    row_timestamps,
+    save_pipeline,
+)
+from bikeshare_model.processing.feature_cache import load_features
+from bikeshare_model.profiling import PipelineProfiler
 
-def run_training() -> None:
+def run_training(
+    *, compress: t.Optional[int] = None, use_feature_cache: bool = True,
+    profiler: t.Optional[PipelineProfiler] = None,
+) -> None:
     
     """
     Train the model.
+    The train/test split and the fitted preprocessing steps come from the
+    feature cache, so only the model is refitted while the data, feature
+    config and transformers are unchanged. With a profiler, the cache is
+    bypassed and every stage of the training run is recorded.
     """
 
-    # read training data
-    data = load_dataset(file_name=config.app_config_.training_data_file)
+    profiler = profiler or PipelineProfiler(enabled=False)
+    bikeshare_pipe = build_bikeshare_pipe()
 
-    # divide train and test
-    X_train, X_test, y_train, y_test = train_test_split(
-        data[config.model_config_.features],  # predictors
-        data[config.model_config_.target],
-        test_size=config.model_config_.test_size,
-        # we are setting the random seed here
-        # for reproducibility
-        random_state=config.model_config_.random_state,
+    # read training data, divide train and test and run the preprocessing steps
+    # (the split uses the configured random seed for reproducibility)
+    features = load_features(
+        file_name=config.app_config_.training_data_file,
+        preprocessing=bikeshare_pipe[:-1],
+        use_cache=use_feature_cache and not profiler.enabled,
+        profiler=profiler,
     )
 
-    # Pipeline fitting
-    bikeshare_pipe.fit(X_train,y_train)
-    y_pred = bikeshare_pipe.predict(X_test)
+    # Model fitting
+    model_name, model = bikeshare_pipe.steps[-1]
+    with profiler.record(model_name, "fit", features.X_train):
+        model.fit(features.X_train, features.y_train)
+    with profiler.record(model_name, "predict", features.X_test):
+        y_pred = model.predict(features.X_test)
     # print("Accuracy(in %):", accuracy_score(y_test, y_pred)*100)
-    mse = mean_squared_error(y_test, y_pred)
-    r2 = r2_score(y_test, y_pred)
+    mse = mean_squared_error(features.y_test, y_pred)
+    r2 = r2_score(features.y_test, y_pred)
 
     print(f"Mean Squared Error: {mse}")
     print(f"R-squared: {r2}")
 
-    # persist trained model
-    save_pipeline(pipeline_to_persist= bikeshare_pipe)
+    # persist trained model, with the newest row it has seen as the incremental training watermark
+    pipeline = Pipeline(features.preprocessing.steps + [(model_name, model)])
+    save_pipeline(pipeline_to_persist=pipeline, compress=compress, watermark=features.watermark)
     # printing the score
     
+def warm_start_fit(*, model: BaseEstimator, X: pd.DataFrame, y: pd.Series, n_new_estimators: int) -> BaseEstimator:
+    """
+    Extend a fitted model with n_new_estimators more trees (or boosting
+    iterations) fitted on new data, keeping the existing ones.
+    """
+
+    if hasattr(model, "max_iter"):
+        model.set_params(warm_start=True, max_iter=model.max_iter + n_new_estimators)
+        return model.fit(X, y)
+
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + n_new_estimators)
+    sample_weight = None
+    if hasattr(model, "classes_"):
+        # The existing trees index their leaf values by the fitted classes_, so new
+        # data must map onto the same classes
+        unseen = np.setdiff1d(np.unique(y), model.classes_)
+        if len(unseen):
+            raise ValueError(f"New data has {len(unseen)} target values the model has never seen; retrain from scratch.")
+
+        # Keep every known class present with zero-weight rows, so classes_ stays the same
+        missing = np.setdiff1d(model.classes_, np.unique(y))
+        padding = X.iloc[np.zeros(len(missing), dtype=int)]
+        X = pd.concat([X, padding])
+        y = pd.concat([pd.Series(np.asarray(y)), pd.Series(missing)], ignore_index=True)
+        sample_weight = np.r_[np.ones(len(X) - len(missing)), np.zeros(len(missing))]
+
+    return model.fit(X, y, sample_weight=sample_weight)
+
+
+def known_target_rows(*, model: BaseEstimator, y: pd.Series) -> np.ndarray:
+    """
+    Mask of the rows warm_start_fit can train on: a classifier only on target
+    values among its classes_, any other model on every row.
+    """
+
+    classes = getattr(model, "classes_", None)
+    if classes is None:
+        return np.ones(len(y), dtype=bool)
+    return np.isin(np.asarray(y), classes)
+
+
+def update_preprocessing(*, preprocessing: Pipeline, X: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge new rows into the state of the fitted preprocessing steps and return them transformed.
+    Steps with partial_fit (running category counts, the outlier reservoir sample if kept,
+    one-hot categories) are updated on the output of the previous step; the
+    stateless ones only transform.
+    """
+
+    for _, step in preprocessing.steps:
+        if hasattr(step, "partial_fit"):
+            step.partial_fit(X)
+        X = step.transform(X)
+    return X
+
+
+def run_incremental_training(*, file_name: t.Optional[str] = None, compress: t.Optional[int] = None) -> int:
+    """
+    Extend the saved pipeline with the rows newer than its training watermark.
+    The preprocessing state is updated with the new rows, the model gets
+    warm_start_n_estimators more estimators fitted on them, and the
+    watermark moves to the newest row. A classifier cannot learn new
+    classes this way, so rows with a target value it has never seen are
+    skipped (a full retrain picks them up). Returns the number of rows
+    trained on (0 leaves the saved pipeline untouched).
+    """
+
+    pipeline = load_pipeline(file_name=pipeline_file_name())
+    watermark = read_manifest().get("watermark")
+    data = load_dataset(file_name=file_name or config.app_config_.training_data_file)
+
+    timestamps = row_timestamps(data)
+    if watermark is not None:
+        new_rows = (timestamps > pd.Timestamp(watermark)).to_numpy()
+        data, timestamps = data[new_rows], timestamps[new_rows]
+    if data.empty:
+        print(f"No rows newer than the watermark {watermark}.")
+        return 0
+
+    model = pipeline[-1]
+    watermark = timestamps.max()
+    known = known_target_rows(model=model, y=data[config.model_config_.target])
+    if not known.all():
+        print(f"Skipping {int((~known).sum())} of {len(data)} new rows with target values the model has never seen; "
+              "retrain from scratch to use them.")
+        data = data[known]
+    if data.empty:
+        return 0
+
+    features = update_preprocessing(preprocessing=pipeline[:-1], X=data[config.model_config_.features])
+    if list(features.columns) != list(model.feature_names_in_):
+        # e.g. a weekday the encoder has never seen: the existing trees cannot use the new column
+        raise ValueError("The new rows change the feature columns the model was fitted on; retrain from scratch.")
+    warm_start_fit(
+        model=model,
+        X=features,
+        y=data[config.model_config_.target],
+        n_new_estimators=config.model_config_.warm_start_n_estimators,
+    )
+
+    save_pipeline(pipeline_to_persist=pipeline, compress=compress, watermark=watermark)
+    return len(data)
+
+
 if __name__ == "__main__":
-    run_training()
+    parser = argparse.ArgumentParser(description="Train the bikeshare model.")
+    parser.add_argument("--incremental", metavar="FILE_NAME", nargs="?", const=config.app_config_.training_data_file,
+                        help="extend the saved model with the rows newer than its watermark "
+                             "(from this file in the datasets folder, by default the training data)")
+    parser.add_argument("--compress", type=int, metavar="LEVEL",
+                        help="joblib compression level for the saved model (0: uncompressed, mmap-able)")
+    parser.add_argument("--no-feature-cache", action="store_true",
+                        help="rebuild the feature matrix instead of using the on-disk cache")
+    parser.add_argument("--profile", action="store_true",
+                        help="print wall time, rows and memory of every training stage")
+    args = parser.parse_args()
+
+    if args.incremental:
+        n_rows = run_incremental_training(file_name=args.incremental, compress=args.compress)
+        print(f"Trained on {n_rows} new rows.")
+    else:
+        profiler = PipelineProfiler(trace_memory=True) if args.profile else None
+        run_training(compress=args.compress, use_feature_cache=not args.no_feature_cache, profiler=profiler)
+        if profiler is not None:
+            print(profiler.report())
@@ -0,0 +1,216 @@
+import argparse
+import contextlib
+import math
+import os
+import time
+import typing as t
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, clone
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler
+from sklearn.pipeline import Pipeline
+
+from bikeshare_model.config.core import config
+from bikeshare_model.pipeline import build_bikeshare_pipe, build_model
+from bikeshare_model.processing.data_manager import load_dataset
+
+
+class FoldFeatures(t.NamedTuple):
+    """One cross-validation fold, already run through the fold's fitted preprocessing steps.
+    Training rows are shuffled, so any prefix of them is a uniform subsample.
+    """
+
+    X_train: np.ndarray
+    y_train: np.ndarray
+    X_val: np.ndarray
+    y_val: np.ndarray
+
+
+# Model and folds sent once per worker process by _init_worker
+_worker_model: t.Optional[BaseEstimator] = None
+_worker_folds: t.Sequence[FoldFeatures] = ()
+
+
+def search_candidates(
+    *, method: t.Optional[str] = None, search_space: t.Optional[t.Dict[str, t.List[t.Any]]] = None,
+    n_candidates: t.Optional[int] = None, random_state: t.Optional[int] = None,
+) -> t.List[dict]:
+    """Hyperparameter sets to try: the full grid of search_space in config.yml, or a random sample of it."""
+
+    model_config = config.model_config_
+    method = method or model_config.search_method
+    search_space = search_space or model_config.search_space
+    if method == "grid":
+        return list(ParameterGrid(search_space))
+    if method == "random":
+        n_candidates = n_candidates or model_config.search_n_candidates
+        random_state = model_config.random_state if random_state is None else random_state
+        return list(ParameterSampler(search_space, n_iter=n_candidates, random_state=random_state))
+    raise ValueError(f"Unknown search method '{method}', expected 'grid' or 'random'.")
+
+
+def build_fold_features(
+    *, X: pd.DataFrame, y: pd.Series, preprocessing: Pipeline, n_folds: int, random_state: int,
+) -> t.List[FoldFeatures]:
+    """Fit a clone of the preprocessing steps on each fold's training rows and transform both sides."""
+
+    rng = np.random.default_rng(random_state)
+    folds = []
+    for train_rows, val_rows in KFold(n_splits=n_folds, shuffle=True, random_state=random_state).split(X):
+        train_rows = rng.permutation(train_rows)
+        steps = clone(preprocessing)
+        folds.append(FoldFeatures(
+            X_train=steps.fit_transform(X.iloc[train_rows], y.iloc[train_rows]).to_numpy(),
+            y_train=y.to_numpy()[train_rows],
+            X_val=steps.transform(X.iloc[val_rows]).to_numpy(),
+            y_val=y.to_numpy()[val_rows],
+        ))
+    return folds
+
+
+def _init_worker(model: BaseEstimator, folds: t.Sequence[FoldFeatures]) -> None:
+    global _worker_model, _worker_folds
+    _worker_model, _worker_folds = model, folds
+
+
+def _score_candidate(
+    params: dict, fold_index: int, n_rows: int,
+    model: t.Optional[BaseEstimator] = None, folds: t.Optional[t.Sequence[FoldFeatures]] = None,
+) -> t.Dict[str, float]:
+    """Fit one candidate on the first n_rows training rows of a fold and score it on the fold's validation rows."""
+
+    model = clone(model if model is not None else _worker_model).set_params(**params)
+    fold = (folds if folds is not None else _worker_folds)[fold_index]
+
+    start = time.perf_counter()
+    model.fit(fold.X_train[:n_rows], fold.y_train[:n_rows])
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    y_pred = model.predict(fold.X_val)
+    predict_seconds = time.perf_counter() - start
+
+    return {
+        "r2": r2_score(fold.y_val, y_pred),
+        "mse": mean_squared_error(fold.y_val, y_pred),
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+    }
+
+
+def halving_rounds(*, n_candidates: int, factor: int) -> int:
+    """Rounds of successive halving that leave at most `factor` candidates for the final, all-rows round."""
+
+    rounds = 1
+    while factor ** rounds < n_candidates:
+        rounds += 1
+    return rounds
+
+
+def run_search(
+    *,
+    file_name: t.Optional[str] = None,
+    model_type: t.Optional[str] = None,
+    method: t.Optional[str] = None,
+    search_space: t.Optional[t.Dict[str, t.List[t.Any]]] = None,
+    n_candidates: t.Optional[int] = None,
+    n_folds: t.Optional[int] = None,
+    halving: bool = True,
+    factor: t.Optional[int] = None,
+    n_workers: t.Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Cross-validated hyperparameter search for the bikeshare model.
+    The preprocessing steps are fitted once per fold and every candidate is
+    fitted on the same preprocessed fold matrices, in a process pool. With
+    successive halving, each round fits the remaining candidates on a larger
+    share of the training rows and keeps the best 1/factor of them; the last
+    round uses all rows. Returns the leaderboard: one row per candidate with
+    its parameters, the last round it reached, mean/std R-squared, MSE and
+    mean fit/predict seconds per fold, best first.
+    """
+
+    model_config = config.model_config_
+    n_folds = n_folds or model_config.cv_folds
+    factor = factor or model_config.halving_factor
+    n_workers = n_workers or os.cpu_count() or 1
+
+    data = load_dataset(file_name=file_name or config.app_config_.training_data_file)
+    folds = build_fold_features(
+        X=data[model_config.features],
+        y=data[model_config.target],
+        preprocessing=build_bikeshare_pipe(model_type=model_type)[:-1],
+        n_folds=n_folds,
+        random_state=model_config.random_state,
+    )
+    candidates = search_candidates(method=method, search_space=search_space, n_candidates=n_candidates)
+
+    # parallelism comes from the pool, so each model fits on one core
+    model = build_model(model_type=model_type)
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=1)
+
+    n_rounds = halving_rounds(n_candidates=len(candidates), factor=factor) if halving else 1
+    max_rows = min(len(fold.y_train) for fold in folds)
+    remaining = list(range(len(candidates)))
+    results: t.Dict[int, dict] = {}
+
+    pool_context = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(model, folds)) \
+        if n_workers > 1 else contextlib.nullcontext()
+    with pool_context as pool:
+        for round_index in range(n_rounds):
+            n_rows = max(max_rows // factor ** (n_rounds - 1 - round_index), 1)
+            tasks = [(candidate, fold_index) for candidate in remaining for fold_index in range(n_folds)]
+            if pool is None:
+                scores = [_score_candidate(candidates[c], f, n_rows, model, folds) for c, f in tasks]
+            else:
+                futures = [pool.submit(_score_candidate, candidates[c], f, n_rows) for c, f in tasks]
+                scores = [future.result() for future in futures]
+
+            for position, candidate in enumerate(remaining):
+                fold_scores = pd.DataFrame(scores[position * n_folds:(position + 1) * n_folds])
+                results[candidate] = {
+                    **candidates[candidate],
+                    "round": round_index,
+                    "train_rows": n_rows,
+                    "mean_r2": fold_scores["r2"].mean(),
+                    "std_r2": fold_scores["r2"].std(ddof=0),
+                    "mean_mse": fold_scores["mse"].mean(),
+                    "fit_seconds": fold_scores["fit_seconds"].mean(),
+                    "predict_seconds": fold_scores["predict_seconds"].mean(),
+                }
+            remaining = sorted(remaining, key=lambda c: results[c]["mean_r2"], reverse=True)
+            remaining = remaining[:max(math.ceil(len(remaining) / factor), 1)]
+
+    leaderboard = pd.DataFrame(results.values()).sort_values(["round", "mean_r2"], ascending=False)
+    leaderboard.insert(0, "rank", range(1, len(leaderboard) + 1))
+    return leaderboard.reset_index(drop=True)
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter search for the bikeshare model.")
+    parser.add_argument("--method", choices=["grid", "random"], help="search method (default: config.yml)")
+    parser.add_argument("--n-candidates", type=int, help="candidates sampled by the random search")
+    parser.add_argument("--folds", type=int, help="cross-validation folds (default: config.yml)")
+    parser.add_argument("--no-halving", action="store_true", help="fit every candidate on all rows")
+    parser.add_argument("--model-type", help="model_type to tune (default: config.yml)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--leaderboard", type=Path, default=Path("tuning_leaderboard.csv"),
+                        help="CSV file to write the leaderboard to (default: tuning_leaderboard.csv)")
+    args = parser.parse_args(argv)
+
+    leaderboard = run_search(
+        model_type=args.model_type, method=args.method, n_candidates=args.n_candidates, n_folds=args.folds,
+        halving=not args.no_halving, n_workers=args.workers,
+    )
+    leaderboard.to_csv(args.leaderboard, index=False)
+
+    print(leaderboard.head(10).to_string(index=False))
+    print(f"Leaderboard of {len(leaderboard)} candidates written to {args.leaderboard}")
+
+
+if __name__ == "__main__":
+    main()
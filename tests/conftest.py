@@ -8,8 +8,11 @@ file = Path(__file__).resolve()
 parent, root = file.parent, file.parents[1]
 sys.path.append(str(root))
 
+from sklearn.ensemble import RandomForestClassifier
+
 from bikeshare_model.config.core import config
-from bikeshare_model.processing.data_manager import load_pipeline
+from bikeshare_model.pipeline import build_bikeshare_pipe
+from bikeshare_model.processing.data_manager import load_dataset, load_pipeline
 from bikeshare_model import __version__ as _version
 
 # Constants
@@ -65,6 +68,22 @@ def raw_training_data():
     return test_data
 
 
+@pytest.fixture(scope="session")
+def small_training_sample():
+    """Fixture for a sample of the bundled dataset, prepared for the pipeline."""
+    data = load_dataset(file_name=config.app_config_.training_data_file)
+    return data.sample(n=300, random_state=0)
+
+
+@pytest.fixture(scope="session")
+def small_trained_pipeline(small_training_sample):
+    """Fixture for a small pipeline fitted on the training sample (no saved model needed)."""
+    pipeline = build_bikeshare_pipe().set_params(model_rf=RandomForestClassifier(n_estimators=5, random_state=0))
+    return pipeline.fit(
+        small_training_sample[config.model_config_.features], small_training_sample[config.model_config_.target]
+    )
+
+
 @pytest.fixture()
 def pipeline_trained():
     """Fixture for loading the trained model pipeline."""
@@ -0,0 +1,105 @@
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import copy
+import json
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bikeshare_model import batch_predict
+from bikeshare_model.batch_predict import predict_parallel, run_batch_prediction
+from bikeshare_model.config.core import config
+
+
+def test_run_batch_prediction_in_chunks(tmp_path, sample_input_df):
+    # Given a file with five copies of the sample rows and one chunk that fails validation
+    valid = pd.concat([sample_input_df] * 5, ignore_index=True)
+    invalid = sample_input_df.assign(temp=["hot", "cold"])
+    input_path = tmp_path / "input.csv"
+    pd.concat([valid, invalid], ignore_index=True).to_csv(input_path, index=False)
+    output_path = tmp_path / "predictions.csv"
+
+    # When
+    result = run_batch_prediction(input_path=input_path, output_path=output_path, chunk_size=2)
+
+    # Then
+    predictions = pd.read_csv(output_path)
+    assert result["rows"] == 10
+    assert result["skipped_rows"] == 2
+    assert result["errors"][0]["first_row"] == 10
+    assert result["rows_per_sec"] > 0
+    assert predictions["row"].tolist() == list(range(10))
+    assert predictions["prediction"].iloc[0] == predictions["prediction"].iloc[2]
+
+
+def test_run_batch_prediction_skips_only_invalid_rows(tmp_path, small_trained_pipeline, sample_input_df):
+    # Given one chunk of six rows, one of which fails validation
+    data = pd.concat([sample_input_df] * 3, ignore_index=True)
+    data["temp"] = data["temp"].astype(object)
+    data.loc[3, "temp"] = "hot"
+    input_path = tmp_path / "input.csv"
+    data.to_csv(input_path, index=False)
+    output_path = tmp_path / "predictions.csv"
+
+    # When
+    result = run_batch_prediction(
+        input_path=input_path, output_path=output_path, chunk_size=50, pipeline=small_trained_pipeline
+    )
+
+    # Then the other five rows are scored and only the invalid one is recorded
+    predictions = pd.read_csv(output_path)
+    assert (result["rows"], result["skipped_rows"]) == (5, 1)
+    assert result["errors"][0]["invalid_rows"] == [3]
+    assert predictions["row"].tolist() == [0, 1, 2, 4, 5]
+    assert '"loc": ["inputs", 3, "temp"]' in result["errors"][0]["errors"]
+
+    # And predict_parallel gives that row a NaN prediction
+    parallel = predict_parallel(input_data=data, n_workers=1, pipeline=small_trained_pipeline)
+    assert np.isnan(parallel["predictions"]).tolist() == [False, False, False, True, False, False]
+
+
+def test_predict_parallel_keeps_row_order(small_trained_pipeline, small_training_sample):
+    # Given
+    data = small_training_sample[config.model_config_.features]
+
+    # When
+    result = predict_parallel(input_data=data, n_workers=2, shard_size=64, pipeline=small_trained_pipeline)
+
+    # Then
+    expected = small_trained_pipeline.predict(data)
+    assert result["errors"] is None
+    np.testing.assert_array_equal(result["predictions"], expected)
+
+
+def test_worker_models_predict_on_one_core(small_trained_pipeline, monkeypatch):
+    # Given a pipeline whose forest would use every core
+    pipeline = copy.deepcopy(small_trained_pipeline).set_params(model_rf__n_jobs=-1)
+    monkeypatch.setattr(batch_predict, "_worker_pipeline", None)
+
+    # When a pool worker is initialised with it
+    batch_predict._init_worker(pipeline)
+
+    # Then
+    assert batch_predict._worker_pipeline[-1].n_jobs == 1
+
+
+def test_predict_parallel_reports_input_row_of_errors(small_trained_pipeline, sample_input_df):
+    # Given an invalid row in the second shard
+    data = pd.concat([sample_input_df] * 3, ignore_index=True)
+    data["temp"] = data["temp"].astype(object)
+    data.loc[4, "temp"] = "hot"
+
+    # When
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", pd.errors.SettingWithCopyWarning)
+        result = predict_parallel(input_data=data, n_workers=1, shard_size=3, pipeline=small_trained_pipeline)
+
+    # Then the error points at the row in the input, not in the shard
+    assert [error["loc"] for errors in result["errors"] for error in json.loads(errors)] == [["inputs", 4, "temp"]]
+    assert np.flatnonzero(np.isnan(result["predictions"])).tolist() == [4]
@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import numpy as np
+import pytest
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
+
+from bikeshare_model.compiled_forest import CompiledForest, compile_pipeline
+from bikeshare_model.config.core import config
+from bikeshare_model.pipeline import build_bikeshare_pipe
+from bikeshare_model.processing.data_manager import load_dataset
+
+
+@pytest.fixture(scope="module")
+def bundled_dataset():
+    return load_dataset(file_name=config.app_config_.training_data_file)
+
+
+def test_compiled_forest_matches_sklearn_on_bundled_dataset(small_trained_pipeline, bundled_dataset):
+    # Given
+    X = bundled_dataset[config.model_config_.features]
+    compiled = compile_pipeline(small_trained_pipeline)
+
+    # When
+    expected = small_trained_pipeline.predict(X)
+    result = compiled.predict(X)
+
+    # Then
+    np.testing.assert_array_equal(result, expected)
+    Xt = small_trained_pipeline[:-1].transform(X)
+    np.testing.assert_array_equal(
+        compiled[-1].predict_proba(Xt), small_trained_pipeline[-1].predict_proba(Xt)
+    )
+
+
+def test_compiled_forest_regressor(small_training_sample, bundled_dataset):
+    # Given
+    pipeline = build_bikeshare_pipe().set_params(model_rf=RandomForestRegressor(n_estimators=5, random_state=0))
+    pipeline.fit(small_training_sample[config.model_config_.features], small_training_sample[config.model_config_.target])
+    X = bundled_dataset[config.model_config_.features]
+
+    # When
+    compiled = compile_pipeline(pipeline)
+
+    # Then
+    np.testing.assert_array_equal(compiled.predict(X), pipeline.predict(X))
+    with pytest.raises(TypeError):
+        CompiledForest.from_forest(pipeline[:-1])
+
+
+def test_compiled_forest_cannot_be_refitted(small_trained_pipeline, small_training_sample):
+    # Given
+    compiled = compile_pipeline(small_trained_pipeline)
+    X = small_training_sample[config.model_config_.features]
+
+    # When / Then a cloned pipeline explains how to rebuild it
+    with pytest.raises(TypeError, match="from_forest"):
+        clone(compiled).fit(X, small_training_sample[config.model_config_.target])
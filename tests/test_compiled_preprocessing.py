@@ -0,0 +1,78 @@
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.base import clone
+
+from bikeshare_model.compiled_preprocessing import CompiledPreprocessor, compile_preprocessing
+from bikeshare_model.config.core import DATASET_DIR, config
+from bikeshare_model.pipeline import build_bikeshare_pipe
+from bikeshare_model.processing.data_manager import load_dataset, pre_pipeline_preparation
+
+
+def _pandas_features(pipeline, X, columns):
+    return pipeline[:-1].transform(X)[list(columns)].to_numpy(dtype=np.float32)
+
+
+def test_compiled_preprocessing_matches_pandas_steps(small_trained_pipeline):
+    # Given typed (categorical) input and plain object input with an unseen category
+    typed = load_dataset(file_name=config.app_config_.training_data_file)[config.model_config_.features]
+    raw = pre_pipeline_preparation(data_frame=pd.read_csv(DATASET_DIR / config.app_config_.training_data_file))
+    raw = raw[config.model_config_.features].copy()
+    raw.loc[raw.index[:5], "season"] = "monsoon"
+
+    # When
+    compiled = CompiledPreprocessor.from_pipeline(small_trained_pipeline)
+
+    # Then every value equals the pandas output cast to float32
+    assert list(compiled.feature_names_out_) == list(small_trained_pipeline[-1].feature_names_in_)
+    for X in (typed, raw, raw.iloc[[7]]):
+        result = compiled.transform_array(X)
+        assert result.dtype == np.float32 and result.flags.c_contiguous
+        np.testing.assert_array_equal(result, _pandas_features(small_trained_pipeline, X, compiled.feature_names_out_))
+    assert raw["weekday"].isna().any()
+
+
+def test_compile_preprocessing_predicts_like_pipeline(small_trained_pipeline, small_training_sample):
+    # Given
+    X = small_training_sample[config.model_config_.features]
+    out = np.empty((len(X), len(small_trained_pipeline[-1].feature_names_in_)), dtype=np.float32)
+
+    # When
+    compiled = compile_preprocessing(small_trained_pipeline)
+
+    # Then
+    np.testing.assert_array_equal(compiled.predict(X), small_trained_pipeline.predict(X))
+    assert compiled[0].transform_array(X, out=out) is out
+    with pytest.raises(ValueError):
+        compiled[0].transform_array(X, out=out[:1])
+
+
+def test_compile_compact_pipeline(small_training_sample):
+    # Given a pipeline with the compact float32 feature step
+    X = small_training_sample[config.model_config_.features]
+    y = small_training_sample[config.model_config_.target]
+    pipeline = build_bikeshare_pipe(compact=True, model_type="random_forest_regressor")
+    pipeline.set_params(model_rf__n_estimators=5).fit(X, y)
+
+    # When
+    compiled = compile_preprocessing(pipeline)
+
+    # Then
+    np.testing.assert_array_equal(compiled[0].transform_array(X), pipeline[:-1].transform(X).to_numpy())
+    np.testing.assert_array_equal(compiled.predict(X), pipeline.predict(X))
+
+
+def test_compiled_preprocessing_cannot_be_refitted(small_trained_pipeline, small_training_sample):
+    # Given
+    compiled = compile_preprocessing(small_trained_pipeline)
+    X = small_training_sample[config.model_config_.features]
+
+    # When / Then
+    with pytest.raises(TypeError, match="from_pipeline"):
+        clone(compiled).fit(X, small_training_sample[config.model_config_.target])
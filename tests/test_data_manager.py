@@ -0,0 +1,183 @@
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from bikeshare_model.config.core import DATASET_DIR, config
+from bikeshare_model.processing import data_manager
+from bikeshare_model.processing.data_manager import (
+    extract_year_month,
+    get_pipeline,
+    load_pipeline,
+    load_raw_dataset,
+    manifest_file_name,
+    parse_dates,
+    pipeline_file_name,
+    pre_pipeline_preparation,
+    read_dataset,
+    read_manifest,
+    reload_pipeline,
+    save_pipeline,
+)
+
+
+def test_pre_pipeline_preparation_parses_dates_once(sample_input_df):
+    # When
+    result = pre_pipeline_preparation(data_frame=sample_input_df)
+
+    # Then
+    assert pd.api.types.is_datetime64_any_dtype(result["dteday"])
+    assert result["year"].tolist() == [2012, 2011]
+    assert result["month"].tolist() == [11, 7]
+
+
+def test_parse_dates_reuses_parsed_column():
+    # Given
+    parsed = pd.to_datetime(pd.Series(["2012-11-05", "2011-07-13"]))
+
+    # When
+    result = parse_dates(parsed)
+
+    # Then
+    assert result is parsed
+    year, month = extract_year_month(pd.DataFrame({"dteday": parsed}))
+    assert year.tolist() == [2012, 2011]
+    assert month.tolist() == [11, 7]
+
+
+def test_get_pipeline_caches_until_file_changes(tmp_path):
+    # Given a persisted object (absolute paths bypass TRAINED_MODEL_DIR)
+    pipeline_path = tmp_path / "pipeline.pkl"
+    joblib.dump({"model": 1}, pipeline_path)
+
+    # When
+    first = get_pipeline(file_name=str(pipeline_path))
+    second = get_pipeline(file_name=str(pipeline_path))
+
+    # Then the cached pipeline is reused
+    assert first is second
+
+    # When the file is replaced
+    joblib.dump({"model": 2}, pipeline_path)
+    os.utime(pipeline_path, ns=(0, pipeline_path.stat().st_mtime_ns + 1_000_000))
+
+    # Then the new pickle is loaded
+    cached = get_pipeline(file_name=str(pipeline_path))
+    assert cached == {"model": 2}
+
+    # And reload forces a fresh load
+    reloaded = reload_pipeline(file_name=str(pipeline_path))
+    assert reloaded is not cached
+    assert reloaded == {"model": 2}
+
+
+@pytest.mark.parametrize("compress", [0, 3])
+def test_save_pipeline_writes_manifest(tmp_path, monkeypatch, compress):
+    # Given a scratch model directory with a stale artifact
+    monkeypatch.setattr(data_manager, "TRAINED_MODEL_DIR", tmp_path)
+    (tmp_path / "bikeshare__model_output_v0.0.0.pkl").write_bytes(b"old")
+    artifact = {"weights": np.arange(1000, dtype=np.float64)}
+
+    # When
+    save_pipeline(pipeline_to_persist=artifact, compress=compress)
+
+    # Then only the new artifact and its manifest are kept
+    manifest = read_manifest()
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted([pipeline_file_name(), manifest_file_name()])
+    assert manifest["mmap_compatible"] is (compress == 0)
+    assert manifest["size_bytes"] == (tmp_path / pipeline_file_name()).stat().st_size
+    assert "dteday" in manifest["features"]
+
+    # And it loads with mmap_mode either way, memory-mapped only when uncompressed
+    loaded = load_pipeline(file_name=pipeline_file_name(), mmap_mode="r", verify=True)
+    np.testing.assert_array_equal(loaded["weights"], artifact["weights"])
+    assert isinstance(loaded["weights"], np.memmap) is (compress == 0)
+
+
+def test_save_pipeline_replaces_artifact_atomically(tmp_path, monkeypatch):
+    # Given a saved pipeline that a worker has memory-mapped
+    monkeypatch.setattr(data_manager, "TRAINED_MODEL_DIR", tmp_path)
+    save_pipeline(pipeline_to_persist={"weights": np.arange(1000, dtype=np.float64)}, compress=0)
+    mapped = load_pipeline(file_name=pipeline_file_name(), mmap_mode="r")
+
+    # When a save fails half way through the dump
+    def failing_dump(value, filename, compress=0):
+        Path(filename).write_bytes(b"partial")
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(joblib, "dump", failing_dump)
+        with pytest.raises(OSError):
+            save_pipeline(pipeline_to_persist={"weights": np.zeros(1000)}, compress=0)
+
+    # Then the previous artifact is intact and no scratch files are left behind
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted([pipeline_file_name(), manifest_file_name()])
+    np.testing.assert_array_equal(load_pipeline(file_name=pipeline_file_name(), verify=True)["weights"], np.arange(1000))
+
+    # And a successful save leaves the mapped arrays of the old file readable
+    save_pipeline(pipeline_to_persist={"weights": np.zeros(1000)}, compress=0)
+    np.testing.assert_array_equal(mapped["weights"], np.arange(1000))
+    assert not load_pipeline(file_name=pipeline_file_name())["weights"].any()
+
+
+def test_load_pipeline_verify_rejects_modified_artifact(tmp_path, monkeypatch):
+    # Given
+    monkeypatch.setattr(data_manager, "TRAINED_MODEL_DIR", tmp_path)
+    save_pipeline(pipeline_to_persist={"model": 1}, compress=0)
+    joblib.dump({"model": 2}, tmp_path / pipeline_file_name())
+
+    # When / Then
+    with pytest.raises(ValueError):
+        load_pipeline(file_name=pipeline_file_name(), verify=True)
+
+
+def test_load_raw_dataset_uses_configured_dtypes():
+    # When
+    data = load_raw_dataset(file_name=config.app_config_.training_data_file, dataset_format="csv")
+
+    # Then
+    assert isinstance(data["season"].dtype, pd.CategoricalDtype)
+    assert data["temp"].dtype == np.float32
+    assert data["cnt"].dtype == np.int32
+    assert data["casual"].dtype == pd.Int32Dtype()
+
+
+def test_read_dataset_keeps_missing_counts(tmp_path):
+    # Given a CSV with a missing casual count
+    raw = pd.read_csv(DATASET_DIR / config.app_config_.training_data_file, nrows=5)
+    raw.loc[1, "casual"] = np.nan
+    raw.to_csv(tmp_path / "missing.csv", index=False)
+
+    # When
+    data = read_dataset(tmp_path / "missing.csv")
+
+    # Then
+    assert data["casual"].isna().tolist() == [False, True, False, False, False]
+    assert (data["registered"] + 100_000 > 100_000).all()
+
+
+def test_load_raw_dataset_converts_binary_copy_once(tmp_path, monkeypatch):
+    # Given a scratch datasets folder
+    file_name = config.app_config_.training_data_file
+    shutil.copy(DATASET_DIR / file_name, tmp_path / file_name)
+    monkeypatch.setattr(data_manager, "DATASET_DIR", tmp_path)
+
+    # When
+    first = load_raw_dataset(file_name=file_name, dataset_format="pickle")
+    binary_path = tmp_path / file_name.replace(".csv", ".pkl")
+    converted_at = binary_path.stat().st_mtime_ns
+    second = load_raw_dataset(file_name=file_name, dataset_format="pickle")
+
+    # Then the copy is written once and keeps the dtypes
+    assert binary_path.stat().st_mtime_ns == converted_at
+    pd.testing.assert_frame_equal(first, second)
+    pd.testing.assert_frame_equal(second, load_raw_dataset(file_name=file_name, dataset_format="csv"))
@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import inspect
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bikeshare_model.config.core import DATASET_DIR, config
+from bikeshare_model.pipeline import build_bikeshare_pipe
+from bikeshare_model.processing import data_manager, feature_cache, features
+from bikeshare_model.processing.feature_cache import feature_cache_key, load_features
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(feature_cache, "FEATURE_CACHE_DIR", tmp_path / "cache")
+    return tmp_path / "cache"
+
+
+def test_load_features_reuses_cached_matrix(cache_dir):
+    # Given
+    file_name = config.app_config_.training_data_file
+
+    # When
+    first = load_features(file_name=file_name, preprocessing=build_bikeshare_pipe()[:-1])
+    second = load_features(file_name=file_name, preprocessing=build_bikeshare_pipe()[:-1])
+    uncached = load_features(file_name=file_name, preprocessing=build_bikeshare_pipe()[:-1], use_cache=False)
+
+    # Then one entry is stored and read back memory-mapped
+    assert len(list(cache_dir.iterdir())) == 1
+    assert isinstance(second.y_train, np.memmap)
+    pd.testing.assert_frame_equal(second.X_test, uncached.X_test.astype(np.float64).reset_index(drop=True))
+    np.testing.assert_array_equal(first.y_train, uncached.y_train)
+    assert first.watermark == second.watermark == uncached.watermark == pd.Timestamp("2012-12-31 23:00")
+
+
+def test_feature_cache_key_changes_with_transformers_and_data(tmp_path, monkeypatch):
+    # Given
+    file_name = config.app_config_.training_data_file
+    key = feature_cache_key(file_name=file_name, preprocessing=build_bikeshare_pipe()[:-1])
+
+    # When a transformer parameter changes
+    preprocessing = build_bikeshare_pipe()[:-1]
+    preprocessing.set_params(**{f"{preprocessing.steps[-1][0]}__copy": True})
+
+    # Then
+    assert feature_cache_key(file_name=file_name, preprocessing=preprocessing) != key
+    assert feature_cache_key(file_name=file_name, preprocessing=build_bikeshare_pipe()[:-1]) == key
+
+    # When the data changes
+    shutil.copy(DATASET_DIR / file_name, tmp_path / file_name)
+    with open(tmp_path / file_name, "a") as data_file:
+        data_file.write(open(DATASET_DIR / file_name).read().splitlines()[-1] + "\n")
+    monkeypatch.setattr(feature_cache, "DATASET_DIR", tmp_path)
+
+    # Then
+    assert feature_cache_key(file_name=file_name, preprocessing=build_bikeshare_pipe()[:-1]) != key
+
+
+@pytest.mark.parametrize("edited", ["features", "parse_dates"])
+def test_feature_cache_key_changes_with_helper_code(monkeypatch, edited):
+    # Given
+    file_name = config.app_config_.training_data_file
+    key = feature_cache_key(file_name=file_name, preprocessing=build_bikeshare_pipe()[:-1])
+    edited_code = {"features": features, "parse_dates": data_manager.parse_dates}[edited]
+    getsource = inspect.getsource
+
+    # When a helper the transformers call, or the data preparation, is edited
+    monkeypatch.setattr(
+        feature_cache.inspect, "getsource",
+        lambda obj: getsource(obj) + ("\n# edited" if obj is edited_code else ""),
+    )
+
+    # Then
+    assert feature_cache_key(file_name=file_name, preprocessing=build_bikeshare_pipe()[:-1]) != key
@@ -15,8 +15,12 @@ from bikeshare_model.processing.features import (
     WeathersitImputer,
     Mapper,
     OutlierHandler,
-    WeekdayOneHotEncoder
+    WeekdayOneHotEncoder,
+    CompactFeatures
 )
+from sklearn.ensemble import RandomForestClassifier
+
+from bikeshare_model.pipeline import build_bikeshare_pipe
 
 
 def test_weekday_imputer():
@@ -38,6 +42,28 @@ def test_weekday_imputer():
     assert result["weekday"].iloc[4] == "Fri"  # Assuming the imputed value is correct
 
 
+def test_weekday_imputer_with_parsed_dates():
+    # Given a batch already parsed by pre_pipeline_preparation, with weekday dropped entirely
+    test_data = pd.DataFrame({
+        "dteday": pd.to_datetime(["2023-10-07", "2023-10-08", "2023-10-08"]),
+        "weekday": [np.nan, np.nan, np.nan],
+    })
+
+    # When
+    imputer = WeekdayImputer(date_column="dteday", weekday_column="weekday")
+    result = imputer.fit(test_data).transform(test_data)
+
+    # Then
+    assert result["weekday"].tolist() == ["Sat", "Sun", "Sun"]
+
+    # And rows are matched by position, even with duplicate index labels
+    resampled = pd.DataFrame({
+        "dteday": pd.to_datetime(["2023-10-07", "2023-10-08", "2023-10-09"]),
+        "weekday": [np.nan, "Sun", np.nan],
+    }, index=[4, 4, 2])
+    assert imputer.transform(resampled)["weekday"].tolist() == ["Sat", "Sun", "Mon"]
+
+
 def test_weathersit_imputer():
     # Given
     test_data = pd.DataFrame({
@@ -56,6 +82,23 @@ def test_weathersit_imputer():
     assert result["weathersit"].iloc[4] == "clear"  # Assuming "clear" is the most frequent
 
 
+def test_imputers_add_missing_categories():
+    # Given categorical columns whose categories lack the values to fill in
+    test_data = pd.DataFrame({
+        "dteday": pd.to_datetime(["2011-09-07", "2011-09-07"]),
+        "weekday": pd.Categorical([np.nan, "Tue"]),
+        "weathersit": pd.Categorical(["Mist", np.nan]),
+    })
+    weathersit_imputer = WeathersitImputer().fit(pd.DataFrame({"weathersit": ["Clear", "Clear", "Mist"]}))
+
+    # When
+    result = weathersit_imputer.transform(WeekdayImputer().transform(test_data))
+
+    # Then
+    assert result["weekday"].tolist() == ["Wed", "Tue"]
+    assert result["weathersit"].tolist() == ["Mist", "Clear"]
+
+
 def test_mapper():
     # Given
     test_data = pd.DataFrame({
@@ -93,6 +136,23 @@ def test_mapper():
     assert result["weathersit"].tolist() == ["clear", "misty", "rainy", "clear"]
 
 
+def test_mapper_lookup_table_matches_series_map():
+    # Given string and Categorical inputs, with an unmapped and a missing value
+    hours = pd.Series(["6am", "4am", "13pm", None, "11pm"])
+    test_data = pd.DataFrame({"hr": hours, "season": pd.Categorical(["fall", "winter", None, "fall", "spring"])})
+
+    # When
+    mapper = Mapper(variables=["hr", "season"])
+    result = mapper.fit(test_data).transform(test_data)
+
+    # Then
+    expected_hr = hours.map(mapper.mappings["hr"])
+    pd.testing.assert_series_equal(result["hr"], expected_hr, check_names=False)
+    assert result["season"].tolist()[:2] == [3, 4]
+    assert np.isnan(result["season"].iloc[2])
+    assert result["season"].iloc[4] == 1
+
+
 def test_outlier_handler():
     # Given
     test_data = pd.DataFrame({
@@ -115,6 +175,57 @@ def test_outlier_handler():
     assert result["hum"].iloc[4] == 1.0
 
 
+def test_outlier_handler_reservoir_partial_fit():
+    # Given data streamed in chunks that all fit in the reservoir
+    rng = np.random.default_rng(0)
+    test_data = pd.DataFrame({"temp": rng.normal(20, 5, 1000), "hum": rng.uniform(0, 100, 1000)})
+    exact = OutlierHandler(columns=["temp", "hum"]).fit(test_data)
+
+    # When
+    streamed = OutlierHandler(columns=["temp", "hum"], quantile_method="reservoir", reservoir_size=1000, random_state=0)
+    for start in range(0, len(test_data), 250):
+        streamed.partial_fit(test_data.iloc[start:start + 250])
+
+    # Then
+    for column in ["temp", "hum"]:
+        assert streamed.bounds[column]["lower"] == pytest.approx(exact.bounds[column]["lower"])
+        assert streamed.bounds[column]["upper"] == pytest.approx(exact.bounds[column]["upper"])
+    result = streamed.transform(pd.DataFrame({"temp": [1000.0], "hum": [-1000.0]}))
+    assert result["temp"].iloc[0] == pytest.approx(exact.bounds["temp"]["upper"])
+    assert result["hum"].iloc[0] == pytest.approx(exact.bounds["hum"]["lower"])
+
+
+def test_partial_fit_merges_fitted_state():
+    # Given transformers fitted on a first chunk
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        "weathersit": ["Clear"] * 30 + ["Mist"] * 20 + ["Mist"] * 25,
+        "weekday": ["Mon", "Tue"] * 35 + ["Sun"] * 5,
+        "temp": rng.normal(20, 5, 75),
+    })
+    first, second = data.iloc[:50], data.iloc[50:]
+    imputer = WeathersitImputer().fit(first)
+    handler = OutlierHandler(columns=["temp"], keep_sample=True).fit(first)
+    frozen = OutlierHandler(columns=["temp"]).fit(first)
+    frozen_bounds = dict(frozen.bounds)
+    encoder = WeekdayOneHotEncoder(column="weekday").fit(first)
+
+    # When the second chunk is merged in
+    imputer.partial_fit(second)
+    handler.partial_fit(second)
+    frozen.partial_fit(second)
+    encoder.partial_fit(second)
+
+    # Then the state matches a fit on all rows, with existing one-hot columns kept in place
+    assert imputer.most_frequent == WeathersitImputer().fit(data).most_frequent == "Mist"
+    exact = OutlierHandler(columns=["temp"]).fit(data)
+    assert handler.bounds["temp"]["lower"] == pytest.approx(exact.bounds["temp"]["lower"])
+    assert handler.bounds["temp"]["upper"] == pytest.approx(exact.bounds["temp"]["upper"])
+    # without keep_sample no rows are kept, and the exact bounds stay as fitted
+    assert frozen.reservoir_ is None and frozen.bounds == frozen_bounds
+    assert encoder.feature_names_.tolist() == ["weekday_Mon", "weekday_Tue", "weekday_Sun"]
+
+
 def test_weekday_one_hot_encoder():
     # Given
     train_data = pd.DataFrame({
@@ -144,4 +255,84 @@ def test_weekday_one_hot_encoder():
     assert "weekday_saturday" not in result.columns
     
     # Check weekday column was dropped
-    assert "weekday" not in result.columns
\ No newline at end of file
+    assert "weekday" not in result.columns
+
+
+def test_weekday_one_hot_encoder_fixed_width():
+    # Given
+    encoder = WeekdayOneHotEncoder(column="weekday").fit(pd.DataFrame({"weekday": ["Mon", "Tue", "Wed"]}))
+    test_data = pd.DataFrame({"temp": [1.0, 2.0, 3.0], "weekday": ["Wed", "Sun", np.nan]})
+
+    # When
+    result = encoder.transform(test_data)
+    sparse_result = WeekdayOneHotEncoder(column="weekday", sparse_output=True).fit(
+        pd.DataFrame({"weekday": ["Mon", "Tue", "Wed"]})
+    ).transform(test_data)
+
+    # Then the block has one uint8 column per fitted category, in fit order
+    assert result.columns.tolist() == ["temp", "weekday_Mon", "weekday_Tue", "weekday_Wed"]
+    assert (result.dtypes.iloc[1:] == np.uint8).all()
+    assert result.iloc[:, 1:].to_numpy().tolist() == [[0, 0, 1], [0, 0, 0], [0, 0, 0]]
+    assert sparse_result.iloc[:, 1:].sparse.to_coo().toarray().tolist() == [[0, 0, 1], [0, 0, 0], [0, 0, 0]]
+
+
+def test_copy_option_controls_input_mutation():
+    # Given
+    test_data = pd.DataFrame({
+        "dteday": ["2023-10-02", "2023-10-03"],
+        "weekday": ["Mon", np.nan],
+    })
+
+    # When
+    copied = WeekdayImputer(copy=True).transform(test_data)
+
+    # Then the caller's frame is untouched
+    assert test_data["weekday"].isna().sum() == 1
+    assert copied["weekday"].tolist() == ["Mon", "Tue"]
+
+    # When
+    in_place = WeekdayImputer(copy=False).transform(test_data)
+
+    # Then the caller's frame was imputed in place
+    assert in_place is test_data
+    assert test_data["weekday"].tolist() == ["Mon", "Tue"]
+
+
+def test_pipeline_copies_input_once(raw_training_data):
+    # Given
+    preprocessing = build_bikeshare_pipe()[:-1]
+    X = raw_training_data[["dteday", "season", "hr", "holiday", "weekday", "workingday", "weathersit", "temp"]]
+    original = X.copy()
+
+    # When
+    result = preprocessing.fit_transform(X)
+
+    # Then
+    pd.testing.assert_frame_equal(X, original)
+    assert "dteday" not in result.columns
+    assert "weekday" not in result.columns
+    assert result["season"].tolist() == [4] * 5
+
+
+def test_compact_pipeline_predicts_like_default(small_training_sample):
+    # Given
+    X = small_training_sample[config.model_config_.features]
+    y = small_training_sample[config.model_config_.target]
+    default, compact = (
+        build_bikeshare_pipe(compact=compact).set_params(model_rf=RandomForestClassifier(n_estimators=5, random_state=0))
+        for compact in (False, True)
+    )
+
+    # When
+    default.fit(X, y)
+    compact.fit(X, y)
+    features = compact[:-1].transform(X)
+    matrix = features.to_numpy()
+
+    # Then the model gets one C-contiguous float32 matrix (int8 ordinals on the way) and predicts the same
+    assert isinstance(compact[-2], CompactFeatures)
+    assert compact.named_steps["mapper"].transform(X.copy())["season"].dtype == np.int8
+    assert matrix.dtype == np.float32 and matrix.flags["C_CONTIGUOUS"]
+    assert np.shares_memory(matrix, features.to_numpy())
+    np.testing.assert_array_equal(matrix, default[:-1].transform(X).to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(compact.predict(X), default.predict(X))
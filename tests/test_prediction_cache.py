@@ -0,0 +1,90 @@
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+from bikeshare_model import prediction_cache
+from bikeshare_model.prediction_cache import PredictionCache, row_keys
+from bikeshare_model.processing.validation import validate_inputs
+
+
+class _CountingPipeline:
+    """Wraps a pipeline and records how many rows each predict call received."""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append(len(X))
+        return self.pipeline.predict(X)
+
+
+def _validated(sample_input_df, repeat=1):
+    validated_data, errors = validate_inputs(input_df=pd.concat([sample_input_df] * repeat, ignore_index=True))
+    assert errors is None
+    return validated_data
+
+
+def test_row_keys_ignore_index_and_dtypes(sample_input_df):
+    # Given the same rows with another index, float counts and categorical columns
+    data = _validated(sample_input_df)
+    other = data.set_index(pd.Index([10, 11])).astype({"casual": float, "season": "category"})
+
+    # When / Then
+    np.testing.assert_array_equal(row_keys(data), row_keys(other))
+    assert row_keys(data)[0] != row_keys(data)[1]
+
+
+def test_cache_predicts_only_misses(small_trained_pipeline, sample_input_df):
+    # Given a batch with two distinct rows repeated three times
+    pipeline = _CountingPipeline(small_trained_pipeline)
+    cache = PredictionCache(max_size=10)
+    data = _validated(sample_input_df, repeat=3)
+
+    # When
+    first = cache.predict(pipeline, data)
+    second = cache.predict(pipeline, data.iloc[[1, 0]])
+
+    # Then each distinct row is predicted once and the second call is served from the cache
+    np.testing.assert_array_equal(first, small_trained_pipeline.predict(data))
+    np.testing.assert_array_equal(second, first[[1, 0]])
+    assert pipeline.calls == [2]
+    assert cache.stats == {"hits": 2, "misses": 6, "evictions": 0, "invalidations": 0}
+
+
+def test_cache_evicts_expires_and_invalidates(small_trained_pipeline, sample_input_df, monkeypatch):
+    # Given a one-entry cache with a 10 second TTL and a controllable clock
+    now = [0.0]
+    monkeypatch.setattr(prediction_cache.time, "monotonic", lambda: now[0])
+    pipeline = _CountingPipeline(small_trained_pipeline)
+    cache = PredictionCache(max_size=1, ttl_seconds=10)
+    data = _validated(sample_input_df)
+
+    # When the second row evicts the first
+    cache.predict(pipeline, data.iloc[[0]])
+    cache.predict(pipeline, data.iloc[[1]])
+    cache.predict(pipeline, data.iloc[[1]])
+    # Then
+    assert len(cache) == 1
+    assert cache.stats["evictions"] == 1
+    assert pipeline.calls == [1, 1]
+
+    # When the entry expires
+    now[0] = 11.0
+    cache.predict(pipeline, data.iloc[[1]])
+    # Then
+    assert pipeline.calls == [1, 1, 1]
+
+    # When a different (e.g. newly loaded) pipeline object is used
+    reloaded = _CountingPipeline(copy.deepcopy(small_trained_pipeline))
+    cache.predict(reloaded, data.iloc[[1]])
+    # Then the old predictions are not reused
+    assert reloaded.calls == [1]
+    assert cache.stats["invalidations"] == 1
@@ -24,7 +24,7 @@ def test_pipeline_trained():
 
 def test_make_prediction(sample_input_data):
     # Given
-    expected_first_prediction_value = 139
+    expected_first_prediction_value = 124
     expected_no_predictions = 2
 
     # When
@@ -80,4 +80,16 @@ def test_make_prediction_with_single_record(prediction_input):
     assert isinstance(predictions, np.ndarray), "Predictions should be a NumPy array"
     assert len(predictions) == 1, f"Expected {1} predictions"
     assert all(isinstance(pred, (int, np.integer)) for pred in predictions), "Each prediction should be an integer"
-    assert result.get("errors") is None, "Errors should be None"
\ No newline at end of file
+    assert result.get("errors") is None, "Errors should be None"
+
+def test_make_prediction_timings_and_short_circuit(sample_input_data, capsys):
+    # When
+    result = make_prediction(input_data=sample_input_data, timings=True)
+    invalid = make_prediction(input_data=dict(sample_input_data, season=["monsoon", "fall"]), timings=True)
+
+    # Then
+    assert set(result["timings"]) == {"validation", "load_pipeline", "predict"}
+    assert all(seconds >= 0 for seconds in result["timings"].values())
+    assert invalid["predictions"] is None
+    assert set(invalid["timings"]) == {"validation"}
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import numpy as np
+from sklearn.base import clone
+
+from bikeshare_model.config.core import config
+from bikeshare_model.profiling import PipelineProfiler
+
+
+def test_profiler_records_every_step(small_trained_pipeline, small_training_sample):
+    # Given
+    X = small_training_sample[config.model_config_.features]
+    seen = []
+    profiler = PipelineProfiler(trace_memory=True, callback=seen.append)
+
+    # When
+    predictions = profiler.predict(small_trained_pipeline, X)
+
+    # Then
+    np.testing.assert_array_equal(predictions, small_trained_pipeline.predict(X))
+    step_names = [name for name, _ in small_trained_pipeline.steps]
+    assert [entry["step"] for entry in profiler.records] == step_names
+    assert seen == profiler.records
+    assert all(entry["rows"] == len(X) and entry["peak_bytes"] >= 0 for entry in profiler.records)
+    summary = profiler.summary()
+    assert list(summary) == ["transform", "predict"]
+    assert summary["predict"][step_names[-1]]["calls"] == 1
+
+
+def test_profiler_fit_matches_pipeline_fit(small_trained_pipeline, small_training_sample):
+    # Given
+    X = small_training_sample[config.model_config_.features]
+    y = small_training_sample[config.model_config_.target]
+    pipeline = clone(small_trained_pipeline)
+    profiler = PipelineProfiler()
+
+    # When
+    profiler.fit(pipeline, X, y)
+
+    # Then
+    np.testing.assert_array_equal(pipeline.predict(X), small_trained_pipeline.predict(X))
+    assert [entry["method"] for entry in profiler.records] == ["fit_transform"] * (len(pipeline.steps) - 1) + ["fit"]
+    assert "peak_bytes" not in profiler.records[0]
+
+
+def test_disabled_profiler_records_nothing(small_trained_pipeline, small_training_sample):
+    # Given
+    X = small_training_sample[config.model_config_.features]
+    profiler = PipelineProfiler(enabled=False)
+
+    # When
+    profiler.predict(small_trained_pipeline, X)
+    with profiler.record("model_rf", "predict", X):
+        pass
+
+    # Then
+    assert profiler.records == []
+    assert profiler.summary() == {}
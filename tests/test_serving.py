@@ -0,0 +1,93 @@
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from bikeshare_model.processing.validation import validate_inputs
+from bikeshare_model.serving import MicroBatcher, start_server
+
+
+def _records(sample_input_df):
+    return json.loads(pd.concat([sample_input_df] * 5, ignore_index=True).to_json(orient="records"))
+
+
+def test_micro_batcher_coalesces_requests(small_trained_pipeline, sample_input_df):
+    # Given ten concurrent single-record requests, one of them invalid
+    records = _records(sample_input_df)
+    records[3]["season"] = "monsoon"
+
+    async def run():
+        async with MicroBatcher(max_batch_size=8, max_wait_ms=50, pipeline=small_trained_pipeline) as batcher:
+            results = await asyncio.gather(*(batcher.predict(record) for record in records))
+            return results, dict(batcher.stats)
+
+    # When
+    results, stats = asyncio.run(run())
+
+    # Then
+    validated_data, _ = validate_inputs(input_df=pd.concat([sample_input_df] * 5, ignore_index=True))
+    expected = small_trained_pipeline.predict(validated_data)
+    assert stats == {"requests": 10, "batches": 2}
+    assert results[3]["prediction"] is None
+    assert "season" in results[3]["errors"]
+    assert [result["prediction"] for i, result in enumerate(results) if i != 3] == [
+        prediction for i, prediction in enumerate(expected.tolist()) if i != 3
+    ]
+
+
+@pytest.mark.parametrize("settle_seconds", [0, 0.05], ids=["still-queued", "in-open-batch"])
+def test_micro_batcher_close_fails_queued_requests(small_trained_pipeline, sample_input_df, settle_seconds):
+    # Given requests the worker has not picked up yet, or that wait for their batch to fill up
+    records = _records(sample_input_df)[:2]
+
+    async def run():
+        batcher = MicroBatcher(max_batch_size=8, max_wait_ms=60_000, pipeline=small_trained_pipeline)
+        requests = [asyncio.create_task(batcher.predict(record)) for record in records]
+        await asyncio.sleep(settle_seconds)
+
+        # When
+        await batcher.close()
+        return await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), timeout=5)
+
+    results = asyncio.run(run())
+
+    # Then
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert "shutting down" in str(results[0])
+
+
+def test_http_predict_round_trip(small_trained_pipeline, sample_input_df):
+    # Given
+    record = _records(sample_input_df)[0]
+
+    async def run():
+        server, batcher = await start_server(port=0, batcher=MicroBatcher(pipeline=small_trained_pipeline))
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps(record).encode()
+        writer.write(
+            f"POST /predict HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        await batcher.close()
+        return response
+
+    # When
+    response = asyncio.run(run())
+
+    # Then
+    head, _, body = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200 OK")
+    payload = json.loads(body)
+    assert payload["errors"] is None
+    assert isinstance(payload["prediction"], int)
@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from bikeshare_model.config import core
+from bikeshare_model.config.core import config, load_config
+
+# Modules `import bikeshare_model.predict` must leave to the first prediction: the YAML parser,
+# the model libraries that unpickling the pipeline pulls in, and the package's own training code
+HEAVY_MODULES = {
+    "strictyaml", "sklearn", "sklearn.ensemble", "joblib", "scipy",
+    "bikeshare_model.pipeline", "bikeshare_model.processing.features",
+}
+
+
+def _import_profile(statement: str) -> dict:
+    """Cumulative import time in microseconds per module, for a statement run in a fresh interpreter."""
+    code = f"import sys; path = list(sys.path); {statement}; assert sys.path == path, 'sys.path was changed'"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=root, capture_output=True, text=True, check=True
+    )
+    profile = {}
+    for line in completed.stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <indented module name>"
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            profile[fields[2].strip()] = int(fields[1])
+    return profile
+
+
+def test_import_is_lazy():
+    # Given a config snapshot written by an earlier process
+    _import_profile("import bikeshare_model.predict")
+
+    # When
+    package = _import_profile("import bikeshare_model")
+    predict = _import_profile("import bikeshare_model.predict")
+
+    # Then the package only reads VERSION, and predict loads no YAML parser or model libraries
+    assert [module for module in package if module.startswith("bikeshare_model")] == ["bikeshare_model"]
+    assert "bikeshare_model.predict" in predict
+    assert not HEAVY_MODULES & set(predict)
+
+
+def test_load_config_uses_snapshot_until_config_changes(tmp_path, monkeypatch):
+    # Given
+    cfg_path = tmp_path / "config.yml"
+    shutil.copy(core.CONFIG_FILE_PATH, cfg_path)
+    snapshot_path = tmp_path / "cache" / "config.json"
+
+    # When
+    parsed = load_config(cfg_path, snapshot_path)
+    with monkeypatch.context() as patched:
+        patched.setattr(core, "fetch_config_from_yaml", lambda cfg_path=None: pytest.fail("config.yml was parsed"))
+        cached = load_config(cfg_path, snapshot_path)
+
+    # Then
+    assert parsed == cached == config
+    assert snapshot_path.is_file()
+
+    # When config.yml changes
+    cfg_path.write_text(cfg_path.read_text().replace("cv_folds: 3", "cv_folds: 5"))
+    stat = cfg_path.stat()
+    os.utime(cfg_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    # Then it is parsed again
+    assert load_config(cfg_path, snapshot_path).model_config_.cv_folds == 5
+
+
+def test_caches_live_outside_the_package(tmp_path, monkeypatch):
+    # Given
+    monkeypatch.setenv("BIKESHARE_MODEL_CACHE_DIR", str(tmp_path / "override"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+
+    # When / Then the override wins, then the user cache directory is used
+    assert core.user_cache_dir() == tmp_path / "override"
+    monkeypatch.delenv("BIKESHARE_MODEL_CACHE_DIR")
+    if os.name != "nt":
+        assert core.user_cache_dir() == tmp_path / "xdg" / "bikeshare_model"
+    assert core.PACKAGE_ROOT not in core.CONFIG_SNAPSHOT_PATH.parents
+    assert core.PACKAGE_ROOT.parent not in core.FEATURE_CACHE_DIR.parents
@@ -0,0 +1,150 @@
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestClassifier, RandomForestRegressor
+
+from bikeshare_model.config.core import config
+from bikeshare_model.pipeline import build_bikeshare_pipe, build_model
+from bikeshare_model.processing import data_manager
+from bikeshare_model.processing.data_manager import (
+    load_pipeline,
+    load_raw_dataset,
+    pipeline_file_name,
+    read_manifest,
+    row_timestamps,
+    save_pipeline,
+)
+from bikeshare_model.train_pipeline import run_incremental_training, warm_start_fit
+
+
+def test_build_model_applies_config():
+    # When
+    forest = build_model(model_type="random_forest_regressor")
+    boosting = build_model(model_type="hist_gradient_boosting_regressor")
+
+    # Then
+    assert forest.get_params()["n_estimators"] == config.model_config_.n_estimators
+    assert forest.get_params()["max_depth"] == config.model_config_.max_depth
+    assert forest.get_params()["max_features"] == config.model_config_.max_features
+    assert forest.get_params()["n_jobs"] == config.model_config_.n_jobs
+    assert isinstance(boosting, HistGradientBoostingRegressor)
+    assert boosting.max_iter == config.model_config_.n_estimators
+    with pytest.raises(ValueError):
+        build_model(model_type="linear")
+
+
+@pytest.mark.parametrize("model_type", ["random_forest_classifier", "random_forest_regressor", "hist_gradient_boosting_regressor"])
+def test_warm_start_fit_adds_estimators(small_training_sample, model_type):
+    # Given a pipeline fitted on the first half of the sample
+    X = small_training_sample[config.model_config_.features]
+    y = small_training_sample[config.model_config_.target]
+    pipeline = build_bikeshare_pipe(model_type=model_type)
+    pipeline[-1].set_params(**({"max_iter": 5} if model_type.startswith("hist") else {"n_estimators": 5}))
+    pipeline.fit(X.iloc[:150], y.iloc[:150])
+    classes = getattr(pipeline[-1], "classes_", None)
+
+    # When the second half arrives (restricted to known targets for the classifier)
+    new_X, new_y = X.iloc[150:], y.iloc[150:]
+    if classes is not None:
+        known = new_y.isin(classes).to_numpy()
+        new_X, new_y = new_X[known], new_y[known]
+    model = warm_start_fit(model=pipeline[-1], X=pipeline[:-1].transform(new_X), y=new_y, n_new_estimators=3)
+
+    # Then
+    if model_type.startswith("hist"):
+        assert model.n_iter_ > 5
+    else:
+        assert len(model.estimators_) == 8
+    if classes is not None:
+        np.testing.assert_array_equal(model.classes_, classes)
+    assert len(pipeline.predict(X)) == len(X)
+
+
+def test_warm_start_fit_rejects_unseen_classes(small_training_sample):
+    # Given
+    X = small_training_sample[config.model_config_.features]
+    y = small_training_sample[config.model_config_.target]
+    pipeline = build_bikeshare_pipe().set_params(model_rf=RandomForestClassifier(n_estimators=3)).fit(X, y)
+
+    # When / Then
+    with pytest.raises(ValueError):
+        warm_start_fit(model=pipeline[-1], X=pipeline[:-1].transform(X), y=y + 100_000, n_new_estimators=2)
+
+
+def test_run_incremental_training_reads_rows_after_watermark(tmp_path, monkeypatch):
+    # Given a saved pipeline trained on the rows up to a watermark, and a dataset with later rows appended
+    raw = load_raw_dataset(file_name=config.app_config_.training_data_file, dataset_format="csv")
+    raw = raw.iloc[np.argsort(row_timestamps(raw).to_numpy())[:400]]
+    (tmp_path / "models").mkdir()
+    monkeypatch.setattr(data_manager, "TRAINED_MODEL_DIR", tmp_path / "models")
+    monkeypatch.setattr(data_manager, "DATASET_DIR", tmp_path)
+    raw.to_csv(tmp_path / "appended.csv", index=False)
+    old = raw.iloc[:300]
+    data = data_manager.pre_pipeline_preparation(data_frame=old.copy())
+    pipeline = build_bikeshare_pipe().set_params(model_rf=RandomForestRegressor(n_estimators=5, random_state=0))
+    pipeline.fit(data[config.model_config_.features], data[config.model_config_.target])
+    save_pipeline(pipeline_to_persist=pipeline, compress=0, watermark=row_timestamps(old).max())
+
+    # When
+    n_rows = run_incremental_training(file_name="appended.csv")
+    n_rows_again = run_incremental_training(file_name="appended.csv")
+
+    # Then only the 100 new rows were used, once
+    updated = load_pipeline(file_name=pipeline_file_name())
+    assert (n_rows, n_rows_again) == (100, 0)
+    assert len(updated[-1].estimators_) == 5 + config.model_config_.warm_start_n_estimators
+    assert pd.Timestamp(read_manifest()["watermark"]) == row_timestamps(raw).max()
+
+
+def test_run_incremental_training_on_a_one_day_file(tmp_path, monkeypatch):
+    # Given a pipeline trained up to 2011-09-06 and a file with only the next day,
+    # which has missing weekday/weathersit values and no 'Clear' rows
+    raw = load_raw_dataset(file_name=config.app_config_.training_data_file, dataset_format="csv")
+    dates = raw[config.model_config_.dteday_col]
+    (tmp_path / "models").mkdir()
+    monkeypatch.setattr(data_manager, "TRAINED_MODEL_DIR", tmp_path / "models")
+    monkeypatch.setattr(data_manager, "DATASET_DIR", tmp_path)
+    raw[dates == "2011-09-07"].to_csv(tmp_path / "daily.csv", index=False)
+    old = data_manager.pre_pipeline_preparation(data_frame=raw[dates <= "2011-09-06"].copy())
+    pipeline = build_bikeshare_pipe().set_params(model_rf=RandomForestRegressor(n_estimators=5, random_state=0))
+    pipeline.fit(old[config.model_config_.features], old[config.model_config_.target])
+    save_pipeline(pipeline_to_persist=pipeline, compress=0, watermark=row_timestamps(old).max())
+
+    # When
+    daily = load_raw_dataset(file_name="daily.csv", dataset_format="csv")
+    n_rows = run_incremental_training(file_name="daily.csv")
+
+    # Then the one-day file has the full categories and its rows are trained on
+    assert "Clear" in daily["weathersit"].cat.categories
+    assert daily["weathersit"].isna().any() and "Clear" not in daily["weathersit"].to_numpy()
+    assert n_rows == 24
+
+
+def test_run_incremental_training_skips_unseen_classes(tmp_path, monkeypatch):
+    # Given a saved classifier and new rows, some with counts it has never seen
+    raw = load_raw_dataset(file_name=config.app_config_.training_data_file, dataset_format="csv")
+    raw = raw.iloc[np.argsort(row_timestamps(raw).to_numpy())[:400]]
+    (tmp_path / "models").mkdir()
+    monkeypatch.setattr(data_manager, "TRAINED_MODEL_DIR", tmp_path / "models")
+    monkeypatch.setattr(data_manager, "DATASET_DIR", tmp_path)
+    raw.to_csv(tmp_path / "appended.csv", index=False)
+    old = data_manager.pre_pipeline_preparation(data_frame=raw.iloc[:300].copy())
+    pipeline = build_bikeshare_pipe().set_params(model_rf=RandomForestClassifier(n_estimators=5, random_state=0))
+    pipeline.fit(old[config.model_config_.features], old[config.model_config_.target])
+    save_pipeline(pipeline_to_persist=pipeline, compress=0, watermark=row_timestamps(old).max())
+    known = raw.iloc[300:][config.model_config_.target].isin(pipeline[-1].classes_)
+
+    # When
+    n_rows = run_incremental_training(file_name="appended.csv")
+
+    # Then the rows with unseen counts are skipped instead of failing the run
+    assert 0 < known.sum() < len(known)
+    assert n_rows == known.sum()
+    np.testing.assert_array_equal(load_pipeline(file_name=pipeline_file_name())[-1].classes_, pipeline[-1].classes_)
+    assert pd.Timestamp(read_manifest()["watermark"]) == row_timestamps(raw).max()
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import numpy as np
+import pytest
+
+from bikeshare_model.config.core import config
+from bikeshare_model.pipeline import build_bikeshare_pipe
+from bikeshare_model.tune_pipeline import build_fold_features, halving_rounds, run_search, search_candidates
+
+
+def test_search_candidates():
+    # Given
+    space = {"max_depth": [2, 3], "n_estimators": [1, 2, 3]}
+
+    # When
+    grid = search_candidates(method="grid", search_space=space)
+    sampled = search_candidates(method="random", search_space=space, n_candidates=4, random_state=0)
+
+    # Then
+    assert len(grid) == 6
+    assert len(sampled) == 4 and all(candidate in grid for candidate in sampled)
+    assert halving_rounds(n_candidates=6, factor=2) == 3
+    with pytest.raises(ValueError):
+        search_candidates(method="bayesian", search_space=space)
+
+
+def test_build_fold_features(small_training_sample):
+    # When
+    folds = build_fold_features(
+        X=small_training_sample[config.model_config_.features],
+        y=small_training_sample[config.model_config_.target],
+        preprocessing=build_bikeshare_pipe()[:-1],
+        n_folds=3,
+        random_state=0,
+    )
+
+    # Then every row is validated once, on the same feature columns as it was trained on
+    assert len(folds) == 3
+    assert sum(len(fold.y_val) for fold in folds) == len(small_training_sample)
+    assert all(fold.X_train.shape[1] == fold.X_val.shape[1] for fold in folds)
+    assert all(len(fold.X_train) == len(fold.y_train) for fold in folds)
+
+
+def test_run_search_with_successive_halving():
+    # When
+    leaderboard = run_search(
+        model_type="random_forest_regressor",
+        method="grid",
+        search_space={"n_estimators": [2, 4], "max_depth": [2, 4]},
+        n_folds=2,
+        factor=2,
+        n_workers=1,
+    )
+
+    # Then half of the candidates reach the final round, which uses all training rows
+    assert len(leaderboard) == 4
+    assert leaderboard["rank"].tolist() == [1, 2, 3, 4]
+    assert leaderboard["round"].tolist() == [1, 1, 0, 0]
+    assert leaderboard["train_rows"].iloc[0] // 2 == leaderboard["train_rows"].iloc[-1]
+    assert leaderboard["mean_r2"].iloc[0] >= leaderboard["mean_r2"].iloc[1]
+    assert np.isfinite(leaderboard[["fit_seconds", "predict_seconds"]].to_numpy()).all()
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+file = Path(__file__).resolve()
+parent, root = file.parent, file.parents[1]
+sys.path.append(str(root))
+
+import json
+
+import pandas as pd
+import pytest
+
+from bikeshare_model.processing.validation import find_invalid_rows, validate_inputs
+
+
+def test_columnar_validation_reports_row_indices(sample_input_df):
+    # Given a batch with invalid values in a few rows
+    test_data = pd.concat([sample_input_df] * 3, ignore_index=True)
+    test_data["season"] = ["winter", "fall", "not", "winter", 1, "fall"]
+    test_data["casual"] = [4, 0, 1, 2.5, 3, 4]
+    test_data["temp"] = [6.1, "hot", 1.0, 2.0, 3.0, 4.0]
+
+    # When
+    invalid_rows = find_invalid_rows(input_df=test_data)
+    _, errors = validate_inputs(input_df=test_data)
+
+    # Then
+    assert invalid_rows["season"][0].tolist() == [2, 4]
+    assert invalid_rows["casual"][0].tolist() == [3]
+    assert invalid_rows["temp"][0].tolist() == [1]
+    assert "hr" not in invalid_rows
+    locations = [error["loc"] for error in json.loads(errors)]
+    assert ["inputs", 2, "season"] in locations
+    assert ["inputs", 1, "temp"] in locations
+
+
+def test_single_record_uses_pydantic(sample_input_df):
+    # Given
+    single_record = sample_input_df.iloc[[0]].assign(weathersit="Sunny")
+
+    # When
+    _, errors = validate_inputs(input_df=single_record)
+
+    # Then
+    assert json.loads(errors)[0]["loc"] == ["inputs", 0, "weathersit"]
+
+
+def test_malformed_date_is_reported_not_raised(sample_input_df):
+    # Given a batch and a single record with a date that does not exist
+    test_data = pd.concat([sample_input_df] * 2, ignore_index=True)
+    test_data["dteday"] = ["2012-11-05", "2012-13-40", "2011-07-13", "2012-11-05"]
+    single_record = sample_input_df.iloc[[0]].assign(dteday="2012-13-40")
+
+    # When
+    validated_data, errors = validate_inputs(input_df=test_data)
+    _, single_errors = validate_inputs(input_df=single_record)
+
+    # Then only that row is reported, quoting the raw value
+    assert json.loads(errors) == [{
+        "type": "datetime_from_date_parsing",
+        "loc": ["inputs", 1, "dteday"],
+        "msg": "Input should be a valid date in the format YYYY-MM-DD",
+        "input": "2012-13-40",
+    }]
+    assert validated_data["dteday"].isna().tolist() == [False, True, False, False]
+    assert [error["loc"] for error in json.loads(single_errors)] == [["inputs", 0, "dteday"]]